@@ -1,11 +1,9 @@
 import streamlit as st
+import itertools
 import os
 import time
-from utils.document_loader import get_pdf_urls, get_course_urls
-from utils.document_processor import extract_doc_ids
-from utils.vector_store import initialize_pinecone, load_data
-from utils.query_processor import process_query
-from config import setup_environment, check_environment_variables
+from utils.metrics import metrics
+from config import setup_environment, check_environment_variables, DEBUG_PANEL
 
 # Page config for better appearance
 st.set_page_config(page_title="Course Catalog Chatbot", layout="wide")
@@ -20,10 +18,6 @@ if "data_loaded" not in st.session_state:
     st.session_state.data_loaded = False
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "source_urls" not in st.session_state:
-    st.session_state.source_urls = {}
-if "pinecone_initialized" not in st.session_state:
-    st.session_state.pinecone_initialized = False
 
 # Title and description
 st.title("UCONN Course Advisor")
@@ -47,9 +41,17 @@ with st.sidebar:
     if not st.session_state.data_loaded:
         if env_status:
             with st.spinner("Loading data... This may take several minutes if embeddings need to be created"):
-                st.session_state.vectorstore = load_data()
-                st.session_state.data_loaded = True
-            st.success("✅ Data loaded successfully!")
+                # Imported here rather than at the top so the page renders
+                # before the vector store and client SDKs are loaded
+                from utils.vector_store import get_vectorstore
+
+                # Shared across sessions; only the first one in the process loads it
+                st.session_state.vectorstore = get_vectorstore()
+                st.session_state.data_loaded = st.session_state.vectorstore is not None
+            if st.session_state.data_loaded:
+                st.success("✅ Data loaded successfully!")
+            else:
+                st.error("Data could not be loaded. Please try again later.")
         else:
             st.error("API keys not found. Please set up your .env file.")
     else:
@@ -59,6 +61,26 @@ with st.sidebar:
     if st.button("Clear Chat History"):
         st.session_state.messages = []
         st.success("Chat history cleared!")
+    
+    # Per-stage latencies and counters for the whole process
+    if DEBUG_PANEL:
+        with st.expander("Debug: latency and counters"):
+            snapshot = metrics.snapshot()
+            if snapshot["spans"]:
+                st.dataframe(
+                    [
+                        {"stage": name, "count": span["count"], "p50 ms": 1000 * span["p50"],
+                         "p95 ms": 1000 * span["p95"], "max ms": 1000 * span["max"]}
+                        for name, span in snapshot["spans"].items()
+                    ],
+                    hide_index=True,
+                )
+            else:
+                st.caption("No spans recorded yet.")
+            if snapshot["counters"]:
+                st.json(snapshot["counters"])
+            st.download_button("Prometheus metrics", metrics.prometheus_text(), "metrics.prom")
+            st.download_button("JSON lines", metrics.jsonl(), "metrics.jsonl")
 
 # Main chat interface with proper positioning
 with chat_container:
@@ -83,15 +105,27 @@ if prompt:
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Generate and display assistant response
+        # Generate and display assistant response, streaming tokens as they arrive
         with st.chat_message("assistant"):
+            from utils.query_processor import stream_query
+
+            start_time = time.time()
+            first_token_time = []
+            
+            def timed_stream(stream):
+                for piece in stream:
+                    if not first_token_time:
+                        first_token_time.append(time.time())
+                    yield piece
+            
+            stream = timed_stream(stream_query(prompt, st.session_state.messages[:-1], st.session_state.vectorstore))  # Exclude current message
             with st.spinner("Thinking..."):
-                start_time = time.time()
-                response = process_query(prompt, st.session_state.messages[:-1])  # Exclude current message
-                elapsed_time = time.time() - start_time
+                first_piece = next(stream, "")
+            response = st.write_stream(itertools.chain([first_piece], stream))
+            elapsed_time = time.time() - start_time
+            time_to_first_token = (first_token_time[0] if first_token_time else time.time()) - start_time
             
-            st.markdown(response)
-            st.caption(f"Response time: {elapsed_time:.2f} seconds")
+            st.caption(f"Time to first token: {time_to_first_token:.2f} seconds · Response time: {elapsed_time:.2f} seconds")
         
         # Add assistant response to chat history
         st.session_state.messages.append({"role": "assistant", "content": response})
\ No newline at end of file
@@ -0,0 +1,94 @@
+# Recall/latency benchmark of vector, BM25, hybrid and re-ranked retrieval on a
+# synthetic course-catalog corpus, optionally with near-duplicate chunks:
+#   python -m benchmarks.hybrid_retrieval --courses 2000 --duplicates 2
+import argparse
+import os
+import random
+import tempfile
+import time
+from utils.course_table import CourseTable
+from utils.fakes import FakeEmbeddings
+from utils.index_sync import make_chunk
+from utils.lexical_index import LexicalIndex, code_tokens, hybrid_search
+from utils.local_store import LocalVectorStore
+from utils.resources import override_resources
+from utils.retriever import Retriever
+
+SUBJECTS = ["CSE", "MATH", "STAT", "PHYS", "CHEM", "BIOL", "ECON", "ECE", "ME", "PSYC"]
+WORDS = (
+    "introduction advanced theory methods systems analysis design data learning models "
+    "applications principles laboratory seminar research structures computation networks "
+    "probability algebra calculus statistics programming security databases optimization"
+).split()
+
+
+def build_corpus(count, rng, duplicates=0):
+    """Return (chunks, course codes) for a synthetic catalog with one chunk per course
+
+    With `duplicates`, each course also gets that many near-duplicate chunks,
+    like the overlapping and boilerplate-laden chunks of real course pages.
+    """
+    codes = sorted({f"{rng.choice(SUBJECTS)} {rng.randint(1000, 5999)}" for _ in range(count)})
+    chunks = []
+    for position, code in enumerate(codes):
+        title = " ".join(rng.choice(WORDS).title() for _ in range(3))
+        prerequisite = rng.choice(codes)
+        description = " ".join(rng.choice(WORDS) for _ in range(40))
+        text = f"{code}. {title}. 3.00 credits. Prerequisite: {prerequisite}. {description}"
+        chunks.append(make_chunk(text, "https://example.edu/catalog", position))
+        for copy in range(duplicates):
+            chunks.append(make_chunk(f"{text} Catalog page {copy + 2}.", "https://example.edu/catalog", position, copy + 2))
+    return chunks, codes
+
+
+def evaluate(name, retrieve, queries, k):
+    hits = 0
+    distinct = 0
+    start = time.perf_counter()
+    for query, code in queries:
+        docs = retrieve(query)[:k]
+        hits += any(doc.page_content.startswith(f"{code}.") for doc in docs)
+        distinct += len({code_tokens(doc.page_content)[0] for doc in docs if code_tokens(doc.page_content)})
+    elapsed = time.perf_counter() - start
+    recall = f"{hits / len(queries):.3f}" if queries[0][1] else "  n/a"
+    print(
+        f"{name:<12} recall@{k}={recall}  distinct courses@{k}={distinct / len(queries):.2f}  "
+        f"{1000 * elapsed / len(queries):.3f} ms/query"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hybrid retrieval")
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--duplicates", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks, codes = build_corpus(args.courses, rng, args.duplicates)
+    embeddings = FakeEmbeddings()
+    store = LocalVectorStore(embeddings)
+    store.upsert(chunks, embeddings.embed_documents([chunk["text"] for chunk in chunks]))
+    lexical_index = LexicalIndex()
+    for chunk in chunks:
+        lexical_index.add(chunk)
+
+    sample = rng.sample(codes, min(args.queries, len(codes)))
+    queries = [(f"What are the prereqs for {code}?", code) for code in sample]
+    print(f"{len(chunks)} chunks, {len(queries)} course-code queries")
+    evaluate("vector", lambda q: store.similarity_search(q, k=args.k), queries, args.k)
+    evaluate("bm25", lambda q: [doc for doc, _ in lexical_index.search(q, args.k)], queries, args.k)
+    evaluate("hybrid", lambda q: hybrid_search(q, store, lexical_index, args.k)[0], queries, args.k)
+
+    # Topic queries have many relevant courses, which is where duplicates crowd the top k
+    topics = [(f"Courses on {rng.choice(WORDS)} and {rng.choice(WORDS)}", None) for _ in sample]
+    with tempfile.TemporaryDirectory() as directory:
+        override_resources(lexical_index=lexical_index, course_table=CourseTable(os.path.join(directory, "courses.sqlite")))
+        for name, mmr_lambda in (("hybrid", 1.0), ("mmr", 0.7)):
+            retriever = Retriever(store, k=args.k, mmr_lambda=mmr_lambda)
+            evaluate(f"{name}-topic", lambda q: retriever.retrieve(q)[0], topics, args.k)
+
+
+if __name__ == "__main__":
+    main()
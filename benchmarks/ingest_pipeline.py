@@ -0,0 +1,34 @@
+# Benchmark the ingest pipeline against latency-injecting fakes:
+#   python -m benchmarks.ingest_pipeline --chunks 2000 --embed-latency 0.2
+import argparse
+from utils.fakes import FakeEmbeddings, InMemoryIndex
+from utils.index_sync import make_chunk
+from utils.ingest_pipeline import run_ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingest pipeline")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--embed-latency", type=float, default=0.2)
+    parser.add_argument("--upsert-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    chunks = [make_chunk(f"chunk {i} " * 20, "https://example.edu/catalog", i) for i in range(args.chunks)]
+    print(f"{'embed':>5} {'upsert':>6} {'seconds':>8} {'vectors/s':>10}")
+    for embed_workers, upsert_workers in [(1, 1), (2, 1), (4, 2), (8, 4)]:
+        store = InMemoryIndex(latency=args.upsert_latency)
+        result = run_ingest(
+            chunks,
+            FakeEmbeddings(dimension=64, latency=args.embed_latency),
+            store,
+            batch_size=args.batch_size,
+            embed_workers=embed_workers,
+            upsert_workers=upsert_workers,
+        )
+        assert len(store) == len(chunks)
+        print(f"{embed_workers:>5} {upsert_workers:>6} {result['seconds']:>8.2f} {result['vectors_per_second']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Pages/second of catalog PDF text extraction by number of worker processes,
+# on a generated catalog-like PDF:
+#   python -m benchmarks.pdf_extraction --pages 400
+import argparse
+import os
+import random
+import tempfile
+import time
+import fitz  # PyMuPDF for PDFs
+from utils.pdf_extract import iter_pdf_file_pages
+
+WORDS = (
+    "introduction advanced theory methods systems analysis design data learning models "
+    "applications principles laboratory seminar research structures computation networks"
+).split()
+
+
+def build_pdf(path, pages, rng):
+    """Write a PDF with `pages` pages of course-entry text"""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        lines = []
+        for entry in range(4):
+            code = f"CSE {1000 + number * 4 + entry}"
+            lines.append(f"{code}. {' '.join(rng.choice(WORDS).title() for _ in range(3))}")
+            lines.append("Three credits. Prerequisite: CSE 1010.")
+            lines.extend(" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(6))
+        page.insert_text((36, 48), "\n".join(lines), fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel PDF text extraction")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.pdf")
+        build_pdf(path, args.pages, random.Random(0))
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+        workers = 1
+        while True:
+            start = time.perf_counter()
+            characters = sum(len(text) for _, text in iter_pdf_file_pages(path, workers, args.pages_per_task))
+            elapsed = time.perf_counter() - start
+            print(f"workers={workers:<3} {args.pages / elapsed:8.1f} pages/s  ({characters} characters)")
+            if workers >= args.max_workers:
+                break
+            workers = min(workers * 2, args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
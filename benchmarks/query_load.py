@@ -0,0 +1,67 @@
+# Headless load test of the async query path against latency-injecting fakes:
+#   python -m benchmarks.query_load --queries 64 --llm-latency 0.3
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from benchmarks.hybrid_retrieval import WORDS, build_corpus
+from utils.answer_cache import SemanticAnswerCache
+from utils.async_query import run_queries
+from utils.course_table import CourseTable
+from utils.fakes import FakeEmbeddings, FakeGroq
+from utils.lexical_index import LexicalIndex
+from utils.local_store import LocalVectorStore
+from utils.resources import override_resources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the async query path")
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks, _ = build_corpus(args.courses, rng)
+    embeddings = FakeEmbeddings(latency=args.embed_latency)
+    store = LocalVectorStore(embeddings)
+    store.upsert(chunks, FakeEmbeddings().embed_documents([chunk["text"] for chunk in chunks]))
+    lexical_index = LexicalIndex()
+    for chunk in chunks:
+        lexical_index.add(chunk)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the real on-disk caches and services out of the run
+        override_resources(
+            embeddings=embeddings,
+            lexical_index=lexical_index,
+            course_table=CourseTable(os.path.join(directory, "courses.sqlite")),
+        )
+        client = FakeGroq(latency=args.llm_latency, token_latency=args.token_latency)
+        queries = [f"Which courses cover {rng.choice(WORDS)} and {rng.choice(WORDS)}? ({i})" for i in range(args.queries)]
+        print(f"{len(queries)} queries over {len(chunks)} chunks")
+        print(f"{'concurrency':>11} {'seconds':>8} {'queries/s':>10} {'p50 ttft':>9} {'p95 total':>10} {'errors':>6}")
+        for concurrency in (1, 4, 16, 64):
+            # A fresh answer cache per round, so no round is served from another's answers
+            override_resources(answer_cache=SemanticAnswerCache(path=None))
+            start = time.perf_counter()
+            results = asyncio.run(run_queries(queries, store, client, concurrency, args.timeout))
+            elapsed = time.perf_counter() - start
+            ok = [result for result in results if result["error"] is None]
+            first_tokens = sorted(result["timings"]["first_token"] for result in ok)
+            totals = sorted(result["timings"]["total"] for result in ok)
+            print(
+                f"{concurrency:>11} {elapsed:>8.2f} {len(queries) / elapsed:>10.1f} "
+                f"{statistics.median(first_tokens) if ok else 0:>9.3f} "
+                f"{totals[int(0.95 * (len(totals) - 1))] if ok else 0:>10.3f} {len(results) - len(ok):>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Cold-start cost of the app, each measured in a fresh interpreter:
+#   python -m benchmarks.startup --runs 5 --budget 1.5
+# Import times come from `python -X importtime`; time to first render runs
+# app.py once with streamlit's AppTest, with empty API keys so no data loads.
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# What app.py imports before its first render, and what it defers to the
+# data-loading, query and ingest paths
+APP_IMPORTS = ["streamlit", "config", "utils.metrics"]
+DEFERRED_IMPORTS = ["utils.query_processor", "utils.vector_store", "utils.document_processor"]
+
+FIRST_RENDER = """
+import json, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+for key in ("GOOGLE_API_KEY", "GROQ_API_KEY", "PINECONE_API_KEY"):
+    app.secrets[key] = ""
+ready = time.perf_counter()
+app.run()
+assert not app.exception, app.exception
+print(json.dumps({"run": time.perf_counter() - ready, "total": time.perf_counter() - start}))
+"""
+
+
+def import_times(modules, preloaded=()):
+    """Return ({module: cumulative seconds}, [(self seconds, module)]) for importing `modules`
+
+    Modules in `preloaded` are imported first and left out, so deferred
+    imports are charged only for what they add on top of the app shell.
+    """
+    code = "".join(f"import {module}\n" for module in preloaded)
+    code += "import sys; sys.stderr.write('-- measured --\\n')\n"
+    code += "".join(f"import {module}\n" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    lines = result.stderr.split("-- measured --\n", 1)[1].splitlines()
+    cumulative, own = {}, []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        cumulative[name.strip()] = int(cumulative_us) / 1e6
+        own.append((int(self_us) / 1e6, name.strip()))
+    return {module: cumulative.get(module, 0.0) for module in modules}, sorted(own, reverse=True)
+
+
+def first_render():
+    """Return (AppTest run seconds, seconds from interpreter start) for one cold render"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", FIRST_RENDER], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return json.loads(result.stdout.strip().splitlines()[-1])["run"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and time to first render")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest individual imports to list")
+    parser.add_argument("--budget", type=float,
+                        help="Exit non-zero if the median cold first render exceeds this many seconds")
+    args = parser.parse_args()
+
+    app_runs = [import_times(APP_IMPORTS) for _ in range(args.runs)]
+    print(f"{'app import':<28} {'median s':>9}")
+    for module in APP_IMPORTS:
+        print(f"{module:<28} {statistics.median(run[0][module] for run in app_runs):>9.3f}")
+    print(f"{'slowest imports (self s)':<28}")
+    for seconds, name in app_runs[-1][1][:args.top]:
+        print(f"  {name:<50} {seconds:>9.3f}")
+
+    print(f"\n{'deferred import':<28} {'median s':>9}")
+    for module in DEFERRED_IMPORTS:
+        runs = [import_times([module], APP_IMPORTS)[0][module] for _ in range(args.runs)]
+        print(f"{module:<28} {statistics.median(runs):>9.3f}")
+
+    renders = [first_render() for _ in range(args.runs)]
+    run_median = statistics.median(run for run, _ in renders)
+    cold_median = statistics.median(cold for _, cold in renders)
+    print(f"\nfirst render: script run {run_median:.3f}s, cold process {cold_median:.3f}s (median of {args.runs})")
+    if args.budget is not None and cold_median > args.budget:
+        sys.exit(f"Cold first render took {cold_median:.3f}s, over the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
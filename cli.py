@@ -0,0 +1,117 @@
+# Headless entry point for batch answering and retrieval evaluation:
+#   python cli.py answer questions.jsonl -o answers.jsonl --concurrency 8
+#   python cli.py eval data/eval_questions.jsonl --offline
+#   python cli.py snapshot --verify
+#   python cli.py export --catalog 2024-2025   (Pinecone namespace -> local index; import goes back)
+# Questions are JSONL records with a "question" and, for eval, "expected_codes".
+import argparse
+import json
+import statistics
+import sys
+from dotenv import load_dotenv
+from config import RETRIEVAL_K, QUERY_TIMEOUT, SNAPSHOT_DIR
+from utils.batch import answer_questions, evaluate_retrieval, offline_vectorstore, read_jsonl, write_jsonl
+from utils.metrics import metrics
+
+
+def load_vectorstore(args):
+    """Return (vectorstore, LLM client) for the run; None for the client means Groq"""
+    if args.offline:
+        return offline_vectorstore(args.corpus)
+    # API keys come from the environment or a .env file rather than Streamlit secrets
+    load_dotenv()
+    from utils.vector_store import get_vectorstore
+
+    return get_vectorstore(), None
+
+
+def run_answer(args, vectorstore, client):
+    results = answer_questions(read_jsonl(args.questions), vectorstore, client, args.concurrency, args.timeout)
+    if args.output:
+        write_jsonl(results, args.output)
+    else:
+        for result in results:
+            print(json.dumps(result))
+    ok = [result for result in results if result["error"] is None]
+    print(f"{len(ok)}/{len(results)} answered", file=sys.stderr)
+    for stage in ("retrieval", "prompt", "first_token", "total"):
+        values = [result["timings"][stage] for result in ok if stage in result["timings"]]
+        if values:
+            print(f"{stage:>12}: median {statistics.median(values):.3f}s, max {max(values):.3f}s", file=sys.stderr)
+
+
+def run_eval(args, vectorstore, client):
+    results, summary = evaluate_retrieval(read_jsonl(args.questions), vectorstore, args.k, args.concurrency)
+    if args.output:
+        write_jsonl(results, args.output)
+    for result in results:
+        if not result["hit"]:
+            print(f"miss: {result['question']} (expected {', '.join(result['expected_codes'])})", file=sys.stderr)
+    print(json.dumps(summary))
+
+
+def run_snapshot(args):
+    """Write a warm-start snapshot of the current index and print its path"""
+    load_dotenv()
+    from utils.snapshot import read_snapshot
+    from utils.vector_store import build_snapshot
+
+    path = build_snapshot(args.snapshot_dir, args.catalog)
+    manifest = read_snapshot(path, verify=args.verify)["manifest"]
+    print(path)
+    print(f"{manifest['catalog']}: {manifest['count']} vectors, {manifest['courses']} courses, "
+          f"version {manifest['version']}", file=sys.stderr)
+
+
+def run_transfer(args):
+    """Copy a catalog between its Pinecone namespace and its local index"""
+    load_dotenv()
+    from utils.vector_store import export_catalog, import_catalog
+
+    if args.mode == "export":
+        print(f"Exported {export_catalog(args.catalog)} vectors from Pinecone", file=sys.stderr)
+    else:
+        print(f"Imported {import_catalog(args.catalog)} vectors into Pinecone", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer or evaluate course-catalog questions without the UI")
+    parser.add_argument("mode", choices=["answer", "eval", "snapshot", "export", "import"])
+    parser.add_argument("questions", nargs="?", help="JSONL file of questions (answer and eval)")
+    parser.add_argument("-o", "--output", help="JSONL file for per-question results")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=QUERY_TIMEOUT)
+    parser.add_argument("--k", type=int, default=RETRIEVAL_K)
+    parser.add_argument("--offline", action="store_true",
+                        help="Use local stand-ins for the LLM and vector store instead of Groq and Pinecone")
+    parser.add_argument("--corpus", help="JSONL chunks for --offline (default: the persisted lexical index)")
+    parser.add_argument("--metrics", help="Write stage metrics here: Prometheus text for .prom/.txt, else JSON lines")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Directory for snapshots (snapshot)")
+    parser.add_argument("--verify", action="store_true", help="Check the written snapshot's checksums (snapshot)")
+    parser.add_argument("--catalog", help="Catalog name, default: the default catalog (snapshot, export, import)")
+    args = parser.parse_args()
+
+    if args.mode == "snapshot":
+        run_snapshot(args)
+        if args.metrics:
+            metrics.export(args.metrics)
+        return
+    if args.mode in ("export", "import"):
+        run_transfer(args)
+        return
+    if not args.questions:
+        parser.error(f"{args.mode} needs a questions file")
+
+    vectorstore, client = load_vectorstore(args)
+    if vectorstore is None:
+        sys.exit("The vector store could not be loaded.")
+    if args.mode == "answer":
+        run_answer(args, vectorstore, client)
+    else:
+        run_eval(args, vectorstore, client)
+    if args.metrics:
+        metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
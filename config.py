@@ -37,4 +37,87 @@ def check_environment_variables():
 # Constants for Pinecone configuration
 PINECONE_INDEX_NAME = "uconn-course-catalog"
 PINECONE_NAMESPACE = "course_catalog"
-EMBEDDING_DIMENSION = 768  # Dimension for Google's embedding model
\ No newline at end of file
+EMBEDDING_DIMENSION = 768  # Dimension for Google's embedding model
+EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_BACKEND = "google"  # "google", or "fake" for deterministic offline embeddings
+
+# Vector store backend: "pinecone", or a local in-process index with "numpy"
+# (exact) or "faiss" (exact "flat" or approximate "hnsw" search)
+VECTOR_BACKEND = "pinecone"
+LOCAL_INDEX_DIR = ".cache/local_index"
+LOCAL_INDEX_TYPE = "flat"
+
+# Constants for the document crawler
+CRAWL_MAX_WORKERS = 8  # Concurrent downloads (also the connection pool size)
+CRAWL_TIMEOUT = 30  # Seconds per request (connect and read)
+CRAWL_MAX_RETRIES = 3  # Retries for connection errors and 429/5xx responses
+CRAWL_BACKOFF = 0.5  # Base delay in seconds, doubled after each retry
+CRAWL_HOST_INTERVAL = 0.1  # Minimum seconds between requests to the same host
+
+# Constants for the on-disk HTTP response cache
+HTTP_CACHE_DIR = ".cache/http"
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Least recently used bodies are evicted past this size
+
+# Index synchronization: "load" reuses existing vectors as-is, "incremental"
+# re-crawls the sources and only embeds/upserts chunks that changed
+INDEX_SYNC_MODE = "load"
+INDEX_MANIFEST_DIR = ".cache/manifests"
+
+# Constants for the persistent embedding cache
+EMBEDDING_CACHE_PATH = ".cache/embeddings.sqlite"
+EMBEDDING_CACHE_MAX_ENTRIES = 200000  # Least recently used vectors are evicted past this count
+
+# Constants for the batched embedding/upsert ingest pipeline
+INGEST_BATCH_SIZE = 100  # Chunks per embedding request and per upsert
+INGEST_EMBED_WORKERS = 4
+INGEST_UPSERT_WORKERS = 2
+INGEST_QUEUE_SIZE = 8  # Batches buffered between stages before producers block
+
+# Constants for process-wide shared clients
+PINECONE_POOL_THREADS = 8  # Connection pool size of the shared Pinecone index handle
+RESOURCE_HEALTH_CHECK_INTERVAL = 60  # Seconds between health checks of a shared client
+
+# Constants for the semantic answer cache
+ANSWER_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity between query embeddings for a hit
+ANSWER_CACHE_TTL = 24 * 60 * 60  # Seconds an answer stays valid
+ANSWER_CACHE_MAX_ENTRIES = 1000  # In-memory entries; least recently used are evicted
+ANSWER_CACHE_PATH = ".cache/answers.sqlite"  # Persistent tier; set to None to disable
+
+# Constants for retrieval
+RETRIEVAL_K = 5  # Chunks passed to the LLM as context
+HYBRID_RETRIEVAL = True  # Fuse BM25 lexical results with vector results
+RRF_K = 60  # Reciprocal-rank-fusion damping constant
+COURSE_LOOKUP = True  # Answer course-code questions from the structured course table
+COURSE_TABLE_PATH = ".cache/courses.sqlite"
+RETRIEVAL_FETCH_K = 20  # Candidates fetched for re-ranking before the top RETRIEVAL_K are chosen
+MMR_LAMBDA = 0.7  # Relevance vs. diversity trade-off of MMR re-ranking (1.0 = relevance only)
+RERANK_BUDGET = 0.05  # Seconds re-ranking may add; past it the fused order is used as is
+
+# Constants for PDF text extraction
+PDF_WORKERS = os.cpu_count() or 1  # Worker processes extracting page ranges in parallel
+PDF_PAGES_PER_TASK = 16  # Pages per worker task
+
+# Constants for prompt assembly
+PROMPT_TOKEN_BUDGET = 6000  # Estimated prompt tokens per request, static prefix included
+PROMPT_HISTORY_TURNS = 4  # Most recent conversation messages considered for the prompt
+PROMPT_HISTORY_SHARE = 0.25  # Share of the budget left after the prefix and query that history may use
+PROMPT_DUPLICATE_THRESHOLD = 0.9  # Word-set Jaccard similarity at which a context chunk counts as a duplicate
+
+# Constants for the async query path
+QUERY_TIMEOUT = 60  # Seconds a query may take end to end, streaming included
+
+# Constants for metrics and tracing
+METRICS_SAMPLES = 1000  # Recent durations kept per span name for quantiles
+METRICS_EVENTS = 5000  # Recent span events kept for JSON-lines export
+INGEST_PROFILE_PATH = None  # Set to a path (e.g. ".cache/ingest.prof") to cProfile ingest runs
+DEBUG_PANEL = True  # Show latency and counter metrics in the sidebar
+
+# Constants for warm-start snapshots
+SNAPSHOT_DIR = ".cache/snapshots"  # Versioned bundles written by `python cli.py snapshot`
+WARM_START = True  # Start from the latest snapshot instead of crawling when no index is available
+
+# Constants for catalog years (see data/catalogs.json)
+# Catalogs to serve: PDFs, course pages and namespace per year; found next to this file from any working directory
+CATALOG_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalogs.json")
+CATALOG_ROUTING = "default"  # Questions naming no year: "default" catalog only, or "all" catalogs merged
+CATALOG_INGEST_WORKERS = 2  # Catalogs crawled and embedded at the same time
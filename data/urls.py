@@ -1,11 +0,0 @@
-# URLs for downloading PDFs and course information
-
-# Hardcoded URLs for PDFs
-pdf_urls = [
-    "https://catalog.uconn.edu/pdf/UConn_2024_2025_Undergraduate_Catalog.pdf",
-    "https://catalog.uconn.edu/pdf/UConn_2024_2025_Graduate_Catalog.pdf"
-]
-
-# Base URLs for undergraduate and graduate courses
-undergraduate_courses_url = "https://catalog.uconn.edu/undergraduate/courses/"
-graduate_courses_url = "https://catalog.uconn.edu/graduate/courses/"
\ No newline at end of file
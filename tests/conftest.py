@@ -0,0 +1,204 @@
+import hashlib
+import json
+import threading
+import time
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import fitz
+import pytest
+
+# A local stand-in for the catalog site: one PDF catalog and one CourseLeaf
+# course page, with ETags so conditional GETs can be answered with 304s.
+COURSE_PAGE = """<html><body>
+<div class="courseblock">
+  <p class="courseblocktitle"><strong>CSE 2050. Data Structures and Object-Oriented Design. 3 Credits.</strong></p>
+  <p class="courseblockdesc">Prerequisite: CSE 1010. Lists, stacks, queues, trees and graphs.</p>
+</div>
+<div class="courseblock">
+  <p class="courseblocktitle"><strong>CSE 3500. Algorithms and Complexity. 3 Credits.</strong></p>
+  <p class="courseblockdesc">Prerequisite: CSE 2050. Design and analysis of efficient algorithms.</p>
+</div>
+</body></html>
+"""
+
+
+def catalog_pdf(text="CSE 2050. Data Structures and Object-Oriented Design.\nThree credits. Lists and trees."):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+class CatalogServer:
+    """Serve `files` (path -> (body, content type)) over HTTP on a free local port
+
+    `delays` holds seconds to wait before answering a path, `statuses` an
+    error status to answer it with instead, and `requests` records (path,
+    If-None-Match header, status code) for each request.
+    """
+
+    def __init__(self):
+        self.files = {
+            "/catalog.pdf": (catalog_pdf(), "application/pdf"),
+            "/courses/cse/": (COURSE_PAGE.encode("utf-8"), "text/html; charset=utf-8"),
+        }
+        self.delays = {}
+        self.statuses = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.delays.get(self.path, 0))
+                if self.path in server.statuses:
+                    self._reply(server.statuses[self.path])
+                    return
+                if self.path not in server.files:
+                    self._reply(404)
+                    return
+                body, content_type = server.files[self.path]
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._reply(304, etag=etag)
+                    return
+                self._reply(200, body, content_type, etag)
+
+            def _reply(self, code, body=b"", content_type="text/plain", etag=None):
+                server.requests.append((self.path, self.headers.get("If-None-Match"), code))
+                self.send_response(code)
+                if etag:
+                    self.send_header("ETag", etag)
+                if code != 304:
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if code != 304:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# Small batches and one worker per stage, so tests control where a sync fails
+PIPELINE = {"batch_size": 2, "embed_workers": 1, "upsert_workers": 1}
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+
+class MemoryStore:
+    """Index-sync store that can be told to fail on its nth upsert"""
+
+    def __init__(self, fail_on=None):
+        self.vectors = {}
+        self.upserts = 0
+        self.fail_on = fail_on
+
+    def upsert(self, chunks, vectors):
+        self.upserts += 1
+        if self.upserts == self.fail_on:
+            raise ConnectionError("upsert failed")
+        for chunk in chunks:
+            self.vectors[chunk["id"]] = chunk
+
+    def delete(self, ids):
+        for key in ids:
+            self.vectors.pop(key, None)
+
+
+class FakePineconeIndex:
+    """In-memory stand-in for a pinecone Index: upsert, list, fetch, delete and stats"""
+
+    def __init__(self, page_size=2):
+        self.namespaces = {}
+        self.page_size = page_size
+
+    def upsert(self, vectors, namespace, async_req=False):
+        stored = self.namespaces.setdefault(namespace, {})
+        for vector_id, values, metadata in vectors:
+            stored[vector_id] = SimpleNamespace(id=vector_id, values=list(values), metadata=dict(metadata))
+        return SimpleNamespace(get=lambda: None) if async_req else None
+
+    def list(self, namespace):
+        ids = list(self.namespaces.get(namespace, {}))
+        for i in range(0, len(ids), self.page_size):
+            yield ids[i:i + self.page_size]
+
+    def fetch(self, ids, namespace):
+        stored = self.namespaces.get(namespace, {})
+        return SimpleNamespace(vectors={key: stored[key] for key in ids if key in stored})
+
+    def delete(self, ids, namespace):
+        for key in ids:
+            self.namespaces.get(namespace, {}).pop(key, None)
+
+    def describe_index_stats(self):
+        return SimpleNamespace(namespaces={
+            namespace: {"vector_count": len(stored)} for namespace, stored in self.namespaces.items() if stored
+        })
+
+
+# Chunks for utils.batch.offline_vectorstore; page 0 marks whole-course chunks
+CORPUS = [
+    {"text": "CSE 2050. Data Structures and Object-Oriented Design. 3 Credits. Prerequisite: CSE 1010. "
+             "Lists, stacks, queues, trees and graphs.", "source": "https://catalog.uconn.edu/courses/cse/", "page": 0},
+    {"text": "CSE 3500. Algorithms and Complexity. 3 Credits. Prerequisite: CSE 2050. "
+             "Design and analysis of efficient algorithms.", "source": "https://catalog.uconn.edu/courses/cse/", "page": 0},
+    {"text": "Students in the Computer Science major complete a senior design project.",
+     "source": "https://catalog.uconn.edu/undergraduate/engineering/computer-science/"},
+]
+
+
+class Status:
+    """Records the labels a status container would show"""
+
+    def __init__(self):
+        self.labels = []
+
+    def update(self, label=None, **kwargs):
+        if label:
+            self.labels.append(label)
+
+    def write(self, *args, **kwargs):
+        self.labels.extend(str(arg) for arg in args)
+
+
+@pytest.fixture
+def catalog_server():
+    with CatalogServer() as server:
+        yield server
+
+
+@pytest.fixture
+def offline(tmp_path):
+    """Offline vector store and FakeGroq client over CORPUS, as (vectorstore, client)"""
+    from utils.batch import offline_vectorstore
+
+    path = tmp_path / "corpus.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in CORPUS))
+    return offline_vectorstore(str(path))
+
+
+@pytest.fixture
+def status():
+    return Status()
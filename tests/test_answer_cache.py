@@ -0,0 +1,40 @@
+import os
+from utils.answer_cache import SemanticAnswerCache, context_fingerprint
+
+
+def test_similar_query_over_the_same_context_is_a_hit():
+    cache = SemanticAnswerCache(threshold=0.95, path=None)
+    fingerprint = context_fingerprint("CSE 2050 context")
+    cache.store([1.0, 0.0, 0.0], fingerprint, "answer")
+    assert cache.lookup([0.99, 0.05, 0.0], fingerprint) == "answer"
+    assert cache.lookup([0.0, 1.0, 0.0], fingerprint) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_changed_context_or_history_is_a_miss():
+    cache = SemanticAnswerCache(path=None)
+    cache.store([1.0, 0.0], context_fingerprint("context"), "answer")
+    assert cache.lookup([1.0, 0.0], context_fingerprint("edited context")) is None
+    assert cache.lookup([1.0, 0.0], context_fingerprint("context", "User: earlier question")) is None
+
+
+def test_expired_and_evicted_entries_are_misses():
+    expiring = SemanticAnswerCache(ttl=-1, path=None)
+    expiring.store([1.0, 0.0], "f", "answer")
+    assert expiring.lookup([1.0, 0.0], "f") is None
+
+    cache = SemanticAnswerCache(max_entries=2, path=None)
+    for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+        cache.store(vector, "f", f"answer {i}")
+    assert cache.lookup([1.0, 0.0, 0.0], "f") is None
+    assert cache.lookup([0.0, 0.0, 1.0], "f") == "answer 2"
+
+
+def test_answers_survive_a_restart(tmp_path):
+    path = os.path.join(tmp_path, "answers.sqlite")
+    SemanticAnswerCache(path=path).store([0.0, 1.0], "f", "answer")
+    cache = SemanticAnswerCache(path=path)
+    assert cache.stats()["entries"] == 0
+    assert cache.lookup([0.0, 1.0], "f") == "answer"
+    cache.clear()
+    assert SemanticAnswerCache(path=path).lookup([0.0, 1.0], "f") is None
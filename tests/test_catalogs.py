@@ -0,0 +1,81 @@
+import json
+import os
+import pytest
+from config import CATALOG_MANIFEST
+from utils.catalogs import load_catalogs, mentioned_years, route_catalogs
+
+
+def manifest(tmp_path, entries):
+    path = tmp_path / "catalogs.json"
+    path.write_text(json.dumps({"catalogs": entries}))
+    return str(path)
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    return load_catalogs(manifest(tmp_path, [
+        {"name": "2023-2024"},
+        {"name": "2024-2025", "default": True},
+        {"name": "2025-2026", "namespace": "catalog_next"},
+        {"name": "2022-2023", "enabled": False},
+    ]))
+
+
+def names(catalogs):
+    return [catalog["name"] for catalog in catalogs]
+
+
+def test_manifest_defaults_and_disabled_entries(catalogs):
+    assert names(catalogs) == ["2023-2024", "2024-2025", "2025-2026"]
+    assert [catalog["namespace"] for catalog in catalogs] == [
+        "course_catalog_2023_2024", "course_catalog_2024_2025", "catalog_next",
+    ]
+    assert catalogs[0]["years"] == (2023, 2024)
+    assert [catalog["default"] for catalog in catalogs] == [False, True, False]
+
+
+def test_manifest_without_a_default_uses_its_first_catalog(tmp_path):
+    catalogs = load_catalogs(manifest(tmp_path, [{"name": "2023-2024"}, {"name": "2024-2025"}]))
+    assert [catalog["default"] for catalog in catalogs] == [True, False]
+
+
+@pytest.mark.parametrize("entries", [
+    [],
+    [{"name": "2024-2025", "enabled": False}],
+    [{"name": "2024-2025"}, {"name": "2024-25"}],
+    [{"name": "spring"}],
+])
+def test_invalid_manifests_are_rejected(tmp_path, entries):
+    with pytest.raises(ValueError):
+        load_catalogs(manifest(tmp_path, entries))
+
+
+def test_the_shipped_manifest_is_found_from_any_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isabs(CATALOG_MANIFEST)
+    assert load_catalogs()
+
+
+@pytest.mark.parametrize("query, years", [
+    ("What changed in the 2023-2024 catalog?", [(2023, 2024)]),
+    ("Was CSE 2050 offered in 2023–24?", [(2023, 2024)]),
+    ("Requirements in 2025", [(2025, None)]),
+    ("What does CSE 2050 cover?", []),
+])
+def test_mentioned_years_ignore_course_codes(query, years):
+    assert mentioned_years(query) == years
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Prerequisites for CSE 3500 in the 2023-2024 catalog?", ["2023-2024"]),
+    ("Which courses were offered in 2024?", ["2023-2024", "2024-2025"]),
+    ("Compare 2023/24 and 2025-26", ["2023-2024", "2025-2026"]),
+    ("What does CSE 2050 cover?", ["2024-2025"]),
+    ("Anything from 1999?", ["2024-2025"]),
+])
+def test_queries_are_routed_to_the_catalogs_they_name(catalogs, query, expected):
+    assert names(route_catalogs(query, catalogs)) == expected
+
+
+def test_all_routing_sends_yearless_queries_everywhere(catalogs):
+    assert names(route_catalogs("What does CSE 2050 cover?", catalogs, routing="all")) == names(catalogs)
@@ -0,0 +1,43 @@
+from utils.course_table import CourseTable
+
+
+def course(code, *requires):
+    return {"code": code, "title": f"{code} title", "credits": "3", "prerequisites": ", ".join(requires),
+            "requires": list(requires), "description": "", "url": "https://catalog.uconn.edu/courses/cse/"}
+
+
+def table(*records):
+    course_table = CourseTable(":memory:")
+    course_table.rebuild(records)
+    return course_table
+
+
+def test_closure_holds_every_indirect_prerequisite_with_its_depth():
+    courses = table(course("CSE 1010"), course("CSE 2050", "CSE 1010"), course("CSE 3500", "CSE 2050", "MATH 2710"))
+    assert courses.prerequisite_chain("cse 3500") == [(1, "CSE 2050"), (1, "MATH 2710"), (2, "CSE 1010")]
+    assert courses.prerequisite_chain("CSE 1010") == []
+
+
+def test_a_course_reached_twice_keeps_its_shortest_depth():
+    courses = table(course("CSE 1010"), course("CSE 2050", "CSE 1010"), course("CSE 3500", "CSE 2050", "CSE 1010"))
+    assert courses.prerequisite_chain("CSE 3500") == [(1, "CSE 1010"), (1, "CSE 2050")]
+
+
+def test_cyclic_prerequisites_terminate():
+    courses = table(course("CSE 2050", "CSE 3500"), course("CSE 3500", "CSE 2050"))
+    assert courses.prerequisite_chain("CSE 2050") == [(1, "CSE 3500")]
+
+
+def test_documents_append_the_chain_and_skip_unknown_codes():
+    courses = table(course("CSE 1010"), course("CSE 2050", "CSE 1010"), course("CSE 3500", "CSE 2050"))
+    docs = courses.documents(["cse3500", "CSE 9999"])
+    assert len(docs) == 1
+    assert docs[0].page_content.endswith("Prerequisite chain: CSE 2050 <- CSE 1010")
+    assert docs[0].metadata["code"] == "CSE 3500"
+
+
+def test_rebuild_replaces_the_previous_graph():
+    courses = table(course("CSE 1010"), course("CSE 2050", "CSE 1010"))
+    courses.rebuild([course("CSE 2050")])
+    assert len(courses) == 1
+    assert courses.prerequisite_chain("CSE 2050") == []
@@ -0,0 +1,76 @@
+import time
+import pytest
+from utils.crawler import HostRateLimiter, crawl
+from utils.document_processor import iter_pages
+from utils.source_index import SourceIndex
+
+
+def body_or_none(url, response):
+    return response.content if response.status_code == 200 else None
+
+
+def run_crawl(urls, **kwargs):
+    return list(crawl(urls, body_or_none, limiter=HostRateLimiter(0), max_retries=0, **kwargs))
+
+
+def test_crawl_yields_each_url_once_with_failures_as_none(catalog_server):
+    urls = [catalog_server.url(path) for path in ("/catalog.pdf", "/courses/cse/", "/courses/missing/")]
+    results = dict(run_crawl(urls))
+    assert set(results) == set(urls)
+    assert results[urls[0]] == catalog_server.files["/catalog.pdf"][0]
+    assert results[urls[2]] is None
+
+
+def test_crawl_yields_in_completion_order(catalog_server):
+    catalog_server.delays["/catalog.pdf"] = 0.3
+    urls = [catalog_server.url("/catalog.pdf"), catalog_server.url("/courses/cse/")]
+    assert [url for url, _ in run_crawl(urls)] == urls[::-1]
+
+
+@pytest.mark.parametrize("slow_path", ["/catalog.pdf", "/courses/cse/"])
+def test_source_order_does_not_depend_on_completion_order(catalog_server, status, slow_path):
+    catalog_server.delays[slow_path] = 0.3
+    pdf_url, course_url = catalog_server.url("/catalog.pdf"), catalog_server.url("/courses/cse/")
+    source_index = SourceIndex()
+    courses = {}
+    pages = list(iter_pages([pdf_url, course_url], status, source_index, courses))
+
+    # Course pages attribute a code before the PDF catalog, whichever finished first
+    assert source_index.lookup("CSE 2050") == [course_url, pdf_url]
+    assert source_index.match("See CSE 2050.") == [("CSE 2050", course_url)]
+    assert courses["CSE 2050"]["url"] == course_url
+    assert {page["source"] for page in pages} == {pdf_url, course_url}
+
+
+def test_unreachable_urls_and_server_errors_are_failed(catalog_server):
+    catalog_server.statuses["/courses/busy/"] = 503
+    urls = [catalog_server.url(path) for path in ("/courses/cse/", "/courses/busy/", "/courses/missing/")]
+    unreachable = "http://127.0.0.1:9/courses/cse/"
+    failed = set()
+    results = dict(run_crawl(urls + [unreachable], failed=failed))
+    assert failed == {urls[1], unreachable}
+    assert results[urls[2]] is None
+
+
+def test_iter_pages_treats_removed_pages_as_gone_not_failed(catalog_server, status):
+    catalog_server.statuses["/courses/old/"] = 410
+    urls = [catalog_server.url(path) for path in ("/courses/cse/", "/courses/missing/", "/courses/old/")]
+    failed = set()
+    pages = list(iter_pages(urls, status, SourceIndex(), {}, failed=failed))
+    assert failed == set()
+    assert {page["source"] for page in pages} == {urls[0]}
+
+
+def test_closing_the_crawl_early_cancels_queued_downloads(catalog_server):
+    paths = [f"/slow/{i}/" for i in range(20)]
+    for path in paths:
+        catalog_server.delays[path] = 0.2
+    results = crawl([catalog_server.url(path) for path in paths], body_or_none,
+                    max_workers=2, limiter=HostRateLimiter(0), max_retries=0)
+    start = time.monotonic()
+    next(results)
+    results.close()
+    # Only the downloads already running finish; the rest are never requested
+    assert time.monotonic() - start < 1.0
+    time.sleep(0.5)
+    assert len(catalog_server.requests) <= 4
@@ -0,0 +1,64 @@
+import os
+import pytest
+from utils.index_sync import load_manifest, make_chunk, sync_chunks, sync_interrupted
+from conftest import PIPELINE, CountingEmbeddings, MemoryStore
+
+
+def chunks_of(source, count, text="text"):
+    return [make_chunk(f"{text} {i}", source, i) for i in range(count)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return os.path.join(tmp_path, "namespace.json")
+
+
+def test_unchanged_chunks_are_not_embedded_again(path):
+    chunks = chunks_of("https://a/", 3)
+    store = MemoryStore()
+    assert sync_chunks(chunks, CountingEmbeddings(), store, path, **PIPELINE) == {"added": 3, "deleted": 0, "unchanged": 0}
+
+    embeddings = CountingEmbeddings()
+    assert sync_chunks(chunks, embeddings, store, path, **PIPELINE) == {"added": 0, "deleted": 0, "unchanged": 3}
+    assert embeddings.embedded == 0
+
+
+def test_stale_chunks_are_deleted(path):
+    store = MemoryStore()
+    sync_chunks(chunks_of("https://a/", 2) + chunks_of("https://b/", 2), CountingEmbeddings(), store, path, **PIPELINE)
+
+    edited = chunks_of("https://a/", 2, text="edited")
+    result = sync_chunks(edited, CountingEmbeddings(), store, path, **PIPELINE)
+    assert result == {"added": 2, "deleted": 4, "unchanged": 0}
+    assert set(store.vectors) == {chunk["id"] for chunk in edited}
+    assert set(load_manifest(path)) == set(store.vectors)
+
+
+def test_chunks_of_failed_sources_are_kept(path):
+    store = MemoryStore()
+    kept = chunks_of("https://b/", 2)
+    sync_chunks(chunks_of("https://a/", 2) + kept, CountingEmbeddings(), store, path, **PIPELINE)
+
+    # https://b/ failed to download this time, so none of its chunks were produced
+    result = sync_chunks(chunks_of("https://a/", 2), CountingEmbeddings(), store, path,
+                         failed_sources={"https://b/"}, **PIPELINE)
+    assert result["deleted"] == 0
+    assert {chunk["id"] for chunk in kept} <= set(store.vectors)
+    assert {chunk["id"] for chunk in kept} <= set(load_manifest(path))
+
+
+def test_interrupted_sync_resumes_after_its_last_committed_batch(path):
+    chunks = chunks_of("https://a/", 6)
+    with pytest.raises(ConnectionError):
+        sync_chunks(chunks, CountingEmbeddings(), MemoryStore(fail_on=2), path, **PIPELINE)
+    assert sync_interrupted(path)
+    assert not os.path.exists(path)
+    assert len(load_manifest(path)) == 2
+
+    embeddings = CountingEmbeddings()
+    store = MemoryStore()
+    result = sync_chunks(chunks, embeddings, store, path, **PIPELINE)
+    assert result == {"added": 4, "deleted": 0, "unchanged": 2}
+    assert embeddings.embedded == 4
+    assert not sync_interrupted(path)
+    assert set(load_manifest(path)) == {chunk["id"] for chunk in chunks}
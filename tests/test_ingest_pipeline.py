@@ -0,0 +1,61 @@
+import itertools
+import threading
+import time
+import pytest
+from utils.index_sync import make_chunk
+from utils.ingest_pipeline import run_ingest
+from conftest import CountingEmbeddings, MemoryStore
+
+
+def chunk_stream(count=None):
+    numbers = itertools.count() if count is None else range(count)
+    for i in numbers:
+        yield make_chunk(f"chunk {i}", "https://a/", i)
+
+
+class SlowStore(MemoryStore):
+    def upsert(self, chunks, vectors):
+        time.sleep(0.01)
+        super().upsert(chunks, vectors)
+
+
+def test_every_chunk_is_upserted_and_committed_once():
+    store = MemoryStore()
+    committed = []
+    lock = threading.Lock()
+
+    def on_commit(batch):
+        with lock:
+            committed.extend(chunk["id"] for chunk in batch)
+
+    result = run_ingest(chunk_stream(53), CountingEmbeddings(), store, on_commit=on_commit,
+                        batch_size=5, embed_workers=3, upsert_workers=2)
+    assert result["vectors"] == 53
+    assert len(store.vectors) == 53
+    assert sorted(committed) == sorted(store.vectors)
+
+
+def test_chunks_are_read_no_further_ahead_than_the_queues_allow():
+    produced = []
+    committed = []
+
+    def chunks():
+        for chunk in chunk_stream(200):
+            produced.append(chunk)
+            # Batches of 1: at most two queues of 1, one batch per worker and the one being fed
+            assert len(produced) - len(committed) <= 6
+            yield chunk
+
+    run_ingest(chunks(), CountingEmbeddings(), SlowStore(), on_commit=committed.extend,
+               batch_size=1, embed_workers=1, upsert_workers=1, queue_size=1)
+    assert len(committed) == 200
+
+
+def test_worker_error_stops_the_pipeline_and_is_raised():
+    class FailingEmbeddings:
+        def embed_documents(self, texts):
+            raise RuntimeError("embedding failed")
+
+    # The chunk stream is endless, so this only returns if the error stops the feed
+    with pytest.raises(RuntimeError, match="embedding failed"):
+        run_ingest(chunk_stream(), FailingEmbeddings(), MemoryStore(), batch_size=2, queue_size=2)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from utils.index_sync import make_chunk
+from utils.local_store import LocalVectorStore
+from utils.vector_store import export_pinecone_namespace, import_into_pinecone
+from conftest import FakePineconeIndex
+
+DIMENSION = 4
+
+
+def random_store(count, backend="numpy", seed=0):
+    rng = np.random.default_rng(seed)
+    store = LocalVectorStore(None, DIMENSION, backend, "flat")
+    chunks = [make_chunk(f"text {i}", f"https://a/{i % 3}", i) for i in range(count)]
+    store.upsert(chunks, rng.normal(size=(count, DIMENSION)))
+    return store, chunks
+
+
+def test_saved_store_loads_with_the_same_rows(tmp_path):
+    store, chunks = random_store(5)
+    store.save(str(tmp_path))
+    loaded = LocalVectorStore.load(str(tmp_path), None)
+    assert loaded.ids == store.ids
+    saved_chunks, saved_vectors = store.vectors_for(store.ids)
+    loaded_chunks, loaded_vectors = loaded.vectors_for(loaded.ids)
+    assert loaded_chunks == saved_chunks
+    np.testing.assert_array_equal(loaded_vectors, saved_vectors)
+    assert LocalVectorStore.load(str(tmp_path / "missing"), None) is None
+
+
+def test_upsert_replaces_rows_and_delete_removes_them():
+    store, chunks = random_store(4)
+    replaced = dict(chunks[1], text="replaced")
+    store.upsert([replaced], [[0.0, 0.0, 0.0, 2.0]])
+    assert len(store) == 4
+    (record,), vectors = store.vectors_for([replaced["id"]])
+    assert record["text"] == "replaced"
+    np.testing.assert_allclose(vectors[0], [0.0, 0.0, 0.0, 1.0])
+
+    store.delete([chunks[0]["id"], "unknown"])
+    assert store.ids == [chunk["id"] for chunk in chunks[1:]]
+    doc, score = store.similarity_search_by_vector_with_score([0.0, 0.0, 0.0, 1.0], k=1)[0]
+    assert doc.id == replaced["id"] and score == pytest.approx(1.0)
+
+
+def test_faiss_backend_agrees_with_numpy():
+    pytest.importorskip("faiss")
+    numpy_store, _ = random_store(50)
+    faiss_store, _ = random_store(50, backend="faiss")
+    query = np.random.default_rng(1).normal(size=DIMENSION)
+    exact = numpy_store.similarity_search_by_vector_with_score(query, k=5)
+    approximate = faiss_store.similarity_search_by_vector_with_score(query, k=5)
+    assert [doc.id for doc, _ in approximate] == [doc.id for doc, _ in exact]
+    assert [score for _, score in approximate] == pytest.approx([score for _, score in exact], abs=1e-5)
+
+
+def test_export_and_import_round_trip_through_pinecone():
+    store, _ = random_store(5)
+    index = FakePineconeIndex()
+    assert import_into_pinecone(store, index, "course_catalog_test") == 5
+
+    exported = LocalVectorStore(None, DIMENSION)
+    assert export_pinecone_namespace(index, "course_catalog_test", exported) == 5
+    assert sorted(exported.ids) == sorted(store.ids)
+    original_chunks, original_vectors = store.vectors_for(store.ids)
+    exported_chunks, exported_vectors = exported.vectors_for(store.ids)
+    assert [chunk["text"] for chunk in exported_chunks] == [chunk["text"] for chunk in original_chunks]
+    assert [chunk["source"] for chunk in exported_chunks] == [chunk["source"] for chunk in original_chunks]
+    np.testing.assert_allclose(exported_vectors, original_vectors, rtol=1e-6)
@@ -0,0 +1,59 @@
+from langchain_core.documents import Document
+from utils.prompt_builder import PromptBuilder
+
+
+def builder(extra_tokens, **kwargs):
+    # The budget is what is left after the fixed system prompt and examples
+    prefix_tokens = PromptBuilder().prefix_tokens
+    return PromptBuilder(token_budget=prefix_tokens + extra_tokens, **kwargs)
+
+
+def history(turns):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i} about course planning and prerequisites?"})
+        messages.append({"role": "assistant", "content": f"Answer {i}: " + "take the courses in order " * 5})
+    return messages
+
+
+def docs(count, words=40):
+    return [Document(page_content=f"CSE {1000 + i}. " + " ".join(f"topic{i}w{j}" for j in range(words)))
+            for i in range(count)]
+
+
+def test_prompt_stays_within_the_budget():
+    prompt_builder = builder(300, history_turns=20)
+    messages, context_docs, used_history = prompt_builder.build("Which courses follow CSE 2050?", docs(30), history(10))
+    assert prompt_builder.message_tokens(messages) <= prompt_builder.token_budget
+    assert 0 < len(context_docs) < 30
+    assert 0 < len(used_history) < 20
+
+
+def test_every_request_starts_with_the_same_prefix():
+    prompt_builder = builder(1000)
+    first, _, _ = prompt_builder.build("First question?", docs(2), [])
+    second, _, _ = prompt_builder.build("Second question?", docs(3), history(1))
+    assert first[:len(prompt_builder.prefix)] == second[:len(prompt_builder.prefix)] == list(prompt_builder.prefix)
+
+
+def test_history_keeps_the_latest_whole_exchanges():
+    prompt_builder = builder(300, history_turns=5)
+    _, _, used_history = prompt_builder.build("Next question?", [], history(4))
+    assert used_history[0]["role"] == "user"
+    assert used_history == history(4)[-len(used_history):]
+
+
+def test_context_drops_near_duplicates_and_skips_what_does_not_fit():
+    prompt_builder = builder(200)
+    big = Document(page_content=" ".join(f"word{j}" for j in range(400)))
+    original, *rest = docs(3, words=10)
+    duplicate = Document(page_content=original.page_content + " again")
+    _, context_docs, _ = prompt_builder.build("Question?", [original, duplicate, big, *rest], [])
+    assert context_docs == [original, *rest]
+
+
+def test_context_is_labelled_with_its_catalog_year():
+    prompt_builder = builder(200)
+    doc = Document(page_content="CSE 2050. Data Structures.", metadata={"catalog": "2024-2025"})
+    messages, _, _ = prompt_builder.build("Question?", [doc], [])
+    assert "[2024-2025 catalog] CSE 2050. Data Structures." in messages[-1]["content"]
@@ -0,0 +1,93 @@
+import os
+from utils.crawler import HostRateLimiter, crawl
+from utils.document_loader import ResponseCache
+
+
+def read_body(url, response):
+    return response.content
+
+
+def run_crawl(urls, cache):
+    return dict(crawl(urls, read_body, limiter=HostRateLimiter(0), max_retries=0, cache=cache))
+
+
+class FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=1):
+        yield self.body
+
+    def close(self):
+        pass
+
+
+def test_unchanged_bodies_are_served_from_cache(catalog_server, tmp_path):
+    urls = [catalog_server.url("/catalog.pdf"), catalog_server.url("/courses/cse/")]
+    first = run_crawl(urls, ResponseCache(str(tmp_path)))
+
+    # A fresh cache over the same directory revalidates from the flushed index
+    cache = ResponseCache(str(tmp_path))
+    second = run_crawl(urls, cache)
+
+    assert second == first
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 0
+    revalidated = catalog_server.requests[len(urls):]
+    assert all(etag is not None and code == 304 for _, etag, code in revalidated)
+
+
+def test_changed_body_is_downloaded_again(catalog_server, tmp_path):
+    url = catalog_server.url("/courses/cse/")
+    run_crawl([url], ResponseCache(str(tmp_path)))
+    catalog_server.files["/courses/cse/"] = (b"<html>changed</html>", "text/html")
+
+    cache = ResponseCache(str(tmp_path))
+    assert run_crawl([url], cache)[url] == b"<html>changed</html>"
+    assert cache.stats["misses"] == 1
+
+
+def test_eviction_skips_open_bodies(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    first = cache.resolve("a", FakeResponse(b"aaaaaa"))
+    cache.resolve("b", FakeResponse(b"bbbbbb")).close()
+    # "a" is least recently used, but still being read
+    assert os.path.exists(first.body_path)
+    assert first.content == b"aaaaaa"
+
+    first.close()
+    cache.resolve("c", FakeResponse(b"cc")).close()
+    assert not os.path.exists(first.body_path)
+
+
+def test_bodies_over_the_cap_are_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.resolve("small", FakeResponse(b"small")).close()
+    large = cache.resolve("large", FakeResponse(b"x" * 20))
+    assert large.content == b"x" * 20
+    large.close()
+
+    assert not os.path.exists(large.body_path)
+    assert cache.conditional_headers("large") == {}
+    assert "small" in cache._entries
+
+
+def test_changed_content_replaces_the_old_body(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=100)
+    for i in range(20):
+        cache.resolve("page", FakeResponse(f"version {i:02d} ".encode() * 4)).close()
+    bodies = os.listdir(os.path.join(tmp_path, "bodies"))
+    assert len(bodies) == 1
+    assert sum(os.path.getsize(os.path.join(tmp_path, "bodies", name)) for name in bodies) <= 100
+
+
+def test_replaced_body_is_removed_once_closed(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    old = cache.resolve("page", FakeResponse(b"old"))
+    cache.resolve("page", FakeResponse(b"new")).close()
+    assert old.content == b"old"
+    old.close()
+    assert not os.path.exists(old.body_path)
@@ -0,0 +1,58 @@
+import numpy as np
+from langchain_core.documents import Document
+from utils.retriever import Retriever, dedupe_by_hash, mmr
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_lambda_one_keeps_the_relevance_order():
+    vectors = np.stack([unit(1, 0), unit(1, 0.01), unit(0, 1)])
+    assert mmr(np.array([0.9, 0.8, 0.7]), vectors, 3, mmr_lambda=1.0) == [0, 1, 2]
+
+
+def test_near_duplicates_give_way_to_a_diverse_candidate():
+    vectors = np.stack([unit(1, 0), unit(1, 0.01), unit(0, 1)])
+    assert mmr(np.array([0.9, 0.8, 0.7]), vectors, 2, mmr_lambda=0.5) == [0, 2]
+
+
+def test_zero_vectors_are_never_redundant():
+    vectors = np.stack([unit(1, 0), np.zeros(2, dtype=np.float32), unit(1, 0.01)])
+    assert mmr(np.array([0.9, 0.8, 0.7]), vectors, 3, mmr_lambda=0.5) == [0, 1, 2]
+
+
+def test_k_larger_than_the_candidates_returns_each_once():
+    vectors = np.stack([unit(1, 0), unit(0, 1)])
+    assert sorted(mmr(np.array([0.5, 0.4]), vectors, 5)) == [0, 1]
+
+
+class VectorStore:
+    """Store stand-in that keeps vectors by document ID, like LocalVectorStore.vectors_for"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def vectors_for(self, ids):
+        chunks = [{"id": key} for key in ids if key in self.vectors]
+        return chunks, np.stack([self.vectors[chunk["id"]] for chunk in chunks])
+
+
+def test_rerank_uses_store_vectors_and_query_similarity():
+    docs = [Document(id=name, page_content=name) for name in ("a", "a2", "b")]
+    store = VectorStore({"a": unit(1, 0), "a2": unit(1, 0.01), "b": unit(0, 1)})
+    retriever = Retriever(store, k=2, mmr_lambda=0.5, budget=1.0)
+    assert [doc.id for doc in retriever._rerank(docs, unit(1, 0.2), 2)] == ["a", "b"]
+
+
+def test_exhausted_budget_keeps_the_fused_order():
+    docs = [Document(id=name, page_content=name) for name in ("a", "a2", "b")]
+    store = VectorStore({"a": unit(1, 0), "a2": unit(1, 0.01), "b": unit(0, 1)})
+    retriever = Retriever(store, k=2, mmr_lambda=0.5, budget=-1.0)
+    assert retriever._rerank(docs, None, 2) == docs
+
+
+def test_exact_duplicates_are_dropped_first():
+    docs = [Document(page_content="same"), Document(page_content="other"), Document(page_content="same")]
+    assert dedupe_by_hash(docs) == docs[:2]
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from utils.answer_cache import SemanticAnswerCache
+from utils.async_query import aprocess_query, astream_query
+from utils.fakes import FakeGroq
+from utils.query_processor import stream_query
+from utils.resources import override_resources
+
+QUESTION = "Which course covers trees and graphs?"
+
+
+def test_tokens_are_yielded_as_they_arrive_then_the_footer(offline):
+    vectorstore, client = offline
+    pieces = list(stream_query(QUESTION, [], vectorstore))
+    assert "".join(pieces[:-1]) == client.reply
+    assert len(pieces) > 2
+    assert pieces[-1].startswith("\n\nSources:")
+    assert client.requests[0]["stream"] is True
+
+
+def test_repeated_question_is_answered_from_the_cache(offline):
+    vectorstore, client = offline
+    first = "".join(stream_query(QUESTION, [], vectorstore))
+    assert list(stream_query(QUESTION, [], vectorstore)) == [first]
+    assert len(client.requests) == 1
+
+
+def test_async_stream_matches_the_sync_one_and_records_timings(offline):
+    vectorstore, client = offline
+    timings = {}
+
+    async def collect():
+        return [token async for token in astream_query(QUESTION, [], vectorstore, timings=timings)]
+
+    pieces = asyncio.run(collect())
+    assert "".join(pieces).startswith(client.reply)
+    assert timings["first_token"] <= timings["total"]
+    assert timings["cached"] is False
+
+
+def test_slow_stream_is_cut_off_at_the_timeout(offline):
+    vectorstore, _ = offline
+    slow = FakeGroq(token_latency=0.2)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(aprocess_query(QUESTION, [], vectorstore, slow, timeout=0.5))
+
+
+def test_course_code_answers_are_cached_too(offline):
+    vectorstore, client = offline
+    first = "".join(stream_query("What are the prerequisites for CSE 3500?", [], vectorstore))
+    again = list(stream_query("What are the prerequisites for CSE 3500?", [], vectorstore))
+    assert again == [first]
+    assert len(client.requests) == 1
+
+
+def test_slow_answer_cache_counts_against_the_timeout(offline):
+    vectorstore, client = offline
+
+    class SlowAnswerCache(SemanticAnswerCache):
+        def lookup(self, query_vector, fingerprint):
+            time.sleep(1.0)
+            return super().lookup(query_vector, fingerprint)
+
+    async def timed_out_after():
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await aprocess_query(QUESTION, [], vectorstore, timeout=0.3)
+        return time.monotonic() - start
+
+    override_resources(answer_cache=SlowAnswerCache(path=None))
+    # The lookup itself keeps running in its worker thread; the query gives up on it
+    assert asyncio.run(timed_out_after()) < 0.9
+    assert client.requests == []
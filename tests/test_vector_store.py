@@ -0,0 +1,45 @@
+import os
+from config import PINECONE_NAMESPACE
+from utils import vector_store
+from utils.course_table import CourseTable
+from utils.index_sync import load_manifest, make_chunk, sync_chunks
+from utils.resources import override_resources
+from utils.vector_store import PineconeIndexWriter, rebuild_sync_manifest, restore_side_indexes
+from conftest import PIPELINE, CountingEmbeddings, FakePineconeIndex
+
+NAMESPACE = "course_catalog_test"
+
+
+def test_lost_manifest_is_rebuilt_from_the_namespace(tmp_path):
+    index = FakePineconeIndex()
+    writer = PineconeIndexWriter(index, NAMESPACE)
+    chunks = [make_chunk(f"text {i}", "https://a/", i) for i in range(3)]
+    writer.upsert(chunks, [[1.0, 0.0]] * 3)
+    # A vector from before manifests existed: random ID, no source metadata
+    index.upsert([("legacy", [0.0, 1.0], {"text": "old text"})], NAMESPACE)
+    path = os.path.join(tmp_path, f"{NAMESPACE}.json")
+
+    assert rebuild_sync_manifest(index, NAMESPACE, path) == 1
+    assert set(load_manifest(path)) == {chunk["id"] for chunk in chunks} | {"legacy"}
+
+    embeddings = CountingEmbeddings()
+    result = sync_chunks(chunks, embeddings, writer, path, **PIPELINE)
+    assert result == {"added": 0, "deleted": 1, "unchanged": 3}
+    assert embeddings.embedded == 0
+    assert set(index.namespaces[NAMESPACE]) == {chunk["id"] for chunk in chunks}
+
+
+def test_namespace_without_courses_is_restored_only_once(tmp_path, monkeypatch, status):
+    for name in ("lexical_index_path", "source_index_path", "course_table_path"):
+        monkeypatch.setattr(vector_store, name, lambda namespace, name=name: os.path.join(tmp_path, f"{namespace}.{name}"))
+    override_resources(course_table=CourseTable(":memory:"))
+    loads = []
+
+    def load_chunks():
+        loads.append(1)
+        # Page 1 chunks only, plus one stored before chunks carried a source
+        return [make_chunk("Senior design project.", "https://a/", 0), make_chunk("old text", "", 1)]
+
+    restore_side_indexes(load_chunks, PINECONE_NAMESPACE, status)
+    restore_side_indexes(load_chunks, PINECONE_NAMESPACE, status)
+    assert len(loads) == 1
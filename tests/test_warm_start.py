@@ -0,0 +1,82 @@
+import json
+import pytest
+from utils import vector_store
+from utils.catalogs import load_catalogs
+from utils.course_table import CourseTable
+from utils.fakes import FakeEmbeddings
+from utils.index_sync import make_chunk
+from utils.local_store import LocalVectorStore
+from utils.resources import override_resources
+from utils.snapshot import latest_snapshot, write_snapshot
+from utils.source_index import SourceIndex
+from conftest import CORPUS, FakePineconeIndex
+
+CATALOG_NAMES = ("2023-2024", "2024-2025", "2025-2026")
+
+
+class UnreachablePinecone:
+    def list_indexes(self):
+        raise ConnectionError("Pinecone is unreachable")
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    path = tmp_path / "catalogs.json"
+    path.write_text(json.dumps({"catalogs": [{"name": name, "default": name == "2024-2025"} for name in CATALOG_NAMES]}))
+    return load_catalogs(str(path))
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    """Keep snapshots and the indexes they install under tmp_path; returns a snapshot writer"""
+    directory = str(tmp_path / "snapshots")
+    monkeypatch.setattr(vector_store, "latest_snapshot", lambda namespace: latest_snapshot(namespace, directory))
+    monkeypatch.setattr(vector_store, "get_course_table", lambda namespace: CourseTable(":memory:"))
+    for name in ("lexical_index_path", "source_index_path", "course_table_path", "manifest_path"):
+        monkeypatch.setattr(vector_store, name, lambda namespace, name=name: str(tmp_path / f"{namespace}.{name}"))
+    embeddings = FakeEmbeddings()
+    override_resources(embeddings=embeddings)
+
+    def write(catalog):
+        chunks = [make_chunk(record["text"], record["source"], i, record.get("page", 1)) for i, record in enumerate(CORPUS)]
+        store = LocalVectorStore(embeddings)
+        store.upsert(chunks, embeddings.embed_documents([chunk["text"] for chunk in chunks]))
+        return write_snapshot(store, SourceIndex(), [], catalog, directory)
+
+    return write
+
+
+def test_unreachable_pinecone_gives_no_index():
+    override_resources(pinecone_client=UnreachablePinecone())
+    assert vector_store._create_pinecone_index() is None
+
+
+def test_without_pinecone_each_catalog_with_a_snapshot_is_served(catalogs, snapshots, monkeypatch):
+    for catalog in catalogs[:2]:
+        snapshots(catalog)
+    override_resources(catalogs=catalogs)
+    monkeypatch.setattr(vector_store, "get_pinecone_index", lambda: None)
+
+    catalog_stores = vector_store.load_data()
+    assert [catalog["name"] for catalog in catalog_stores.catalogs] == ["2023-2024", "2024-2025"]
+    assert all(len(store) == len(CORPUS) for store in catalog_stores.stores.values())
+
+
+def test_failing_namespace_falls_back_to_its_snapshot(catalogs, snapshots, status):
+    class FailingIndex(FakePineconeIndex):
+        def describe_index_stats(self):
+            raise ConnectionError("Pinecone is unreachable")
+
+    catalog = catalogs[1]
+    snapshots(catalog)
+    store = vector_store.load_pinecone_catalog(catalog, FailingIndex(), FakeEmbeddings(), status)
+    assert isinstance(store, LocalVectorStore)
+    assert len(store) == len(CORPUS)
+    assert "Serving the latest snapshot locally instead." in status.labels
+
+
+def test_empty_namespace_is_bulk_loaded_from_the_snapshot(catalogs, snapshots, status):
+    snapshots(catalogs[1])
+    index = FakePineconeIndex()
+    vector_store.load_pinecone_catalog(catalogs[1], index, FakeEmbeddings(), status)
+    assert len(index.namespaces[catalogs[1]["namespace"]]) == len(CORPUS)
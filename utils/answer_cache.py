@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config import ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_PATH
+from utils.metrics import increment
+
+
+def context_fingerprint(context, conversation_history_str=""):
+    """Fingerprint the retrieved context (and history) an answer was based on"""
+    key = f"{context}\x00{conversation_history_str}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticAnswerCache:
+    """Cache of LLM answers looked up by query-embedding similarity
+
+    A cached answer is reused when the new query's embedding has cosine
+    similarity of at least `threshold` with the cached one *and* the retrieved
+    context fingerprint is identical, so a changed index or conversation never
+    serves a stale answer. Entries expire after `ttl` seconds. The in-memory
+    tier keeps `max_entries` entries in LRU order; with a `path`, answers are
+    also written to a SQLite tier that survives restarts and is consulted on
+    in-memory misses.
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, ttl=ANSWER_CACHE_TTL,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, path=ANSWER_CACHE_PATH):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, vector BLOB NOT NULL, "
+                "answer TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS answers_fingerprint ON answers (fingerprint)")
+            self._conn.commit()
+
+    def _best_match(self, candidates, vector):
+        """Return the (key, entry) most similar to vector above the threshold"""
+        if not candidates:
+            return None
+        matrix = np.stack([entry["vector"] for _, entry in candidates])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return candidates[best] if scores[best] >= self.threshold else None
+
+    def lookup(self, query_vector, fingerprint):
+        """Return a cached answer for a similar query over the same context, or None"""
+        vector = _normalize(query_vector)
+        now = time.time()
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if now - entry["created"] > self.ttl]:
+                del self._entries[key]
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry["fingerprint"] == fingerprint]
+            match = self._best_match(candidates, vector)
+            if match is None and self._conn is not None:
+                match = self._lookup_persistent(vector, fingerprint, now)
+            if match is None:
+                self.misses += 1
+                increment("answer_cache.misses")
+                return None
+            key, entry = match
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            self.hits += 1
+            increment("answer_cache.hits")
+            return entry["answer"]
+
+    def _lookup_persistent(self, vector, fingerprint, now):
+        rows = self._conn.execute(
+            "SELECT key, vector, answer, created FROM answers WHERE fingerprint = ? AND created >= ?",
+            (fingerprint, now - self.ttl),
+        ).fetchall()
+        candidates = [
+            (key, {"vector": np.frombuffer(blob, dtype=np.float32), "fingerprint": fingerprint,
+                   "answer": answer, "created": created})
+            for key, blob, answer, created in rows
+        ]
+        return self._best_match(candidates, vector)
+
+    def store(self, query_vector, fingerprint, answer):
+        """Cache an answer for a query embedding and context fingerprint"""
+        vector = _normalize(query_vector)
+        key = hashlib.sha256(vector.tobytes() + fingerprint.encode("utf-8")).hexdigest()
+        entry = {"vector": vector, "fingerprint": fingerprint, "answer": answer, "created": time.time()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO answers (key, fingerprint, vector, answer, created) VALUES (?, ?, ?, ?, ?)",
+                    (key, fingerprint, vector.tobytes(), answer, entry["created"]),
+                )
+                self._conn.execute("DELETE FROM answers WHERE created < ?", (entry["created"] - self.ttl,))
+                self._conn.commit()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM answers")
+                self._conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters, hit rate and in-memory entry count"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
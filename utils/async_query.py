@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from config import QUERY_TIMEOUT
+from utils.query_processor import (
+    COMPLETION_OPTIONS,
+    prepare_request,
+    retrieve_documents,
+    sources_footer,
+    store_response,
+)
+from utils.metrics import increment, metrics
+from utils.resources import get_groq_client, get_prompt_builder
+
+# Blocking clients (embeddings, Pinecone, Groq) are bridged onto the event loop
+# through worker threads, so one loop can keep many queries in flight.
+
+_DONE = object()
+
+
+def _remaining(deadline):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("Query timed out")
+    return remaining
+
+
+async def _stream_completion(client, messages, deadline):
+    """Yield completion tokens from a blocking streaming client
+
+    A dedicated thread iterates the stream (so long generations never tie up
+    the default executor that retrieval runs on) and hands tokens to the
+    loop through a queue. If the consumer stops early, is cancelled or times
+    out, the thread is told to stop and closes the stream, releasing the
+    connection.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # The loop is gone; nobody is listening any more
+
+    def pump():
+        stream = None
+        try:
+            stream = client.chat.completions.create(messages=messages, stream=True, **COMPLETION_OPTIONS)
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                token = chunk.choices[0].delta.content
+                if token:
+                    post(token)
+            post(_DONE)
+        except Exception as e:
+            post(e)
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    start = time.perf_counter()
+    chunks = 0
+    threading.Thread(target=pump, daemon=True).start()
+    try:
+        while True:
+            item = await asyncio.wait_for(queue.get(), _remaining(deadline))
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if not chunks:
+                metrics.record("query.first_token", time.perf_counter() - start)
+            chunks += 1
+            yield item
+        metrics.record("query.completion", time.perf_counter() - start)
+        increment("llm.completion_chunks", chunks)
+    finally:
+        stop.set()
+
+
+async def astream_query(query, conversation_history, vectorstore, client=None,
+                        timeout=QUERY_TIMEOUT, timings=None):
+    """Async counterpart of stream_query for an explicit vector store
+
+    The whole request, including streaming, must finish within `timeout`
+    seconds or asyncio.TimeoutError is raised; cancelling the consuming task
+    cancels the request. A blocking call already running in a worker thread
+    (e.g. the query embedding) cannot be interrupted: it finishes in the
+    background and its result is dropped. A `timings` dict is filled with the
+    seconds spent retrieving, preparing the prompt, until the first token and
+    in total.
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    plan = get_prompt_builder().prepare(query, conversation_history)
+    relevant_docs, query_vector = await asyncio.wait_for(
+        asyncio.to_thread(retrieve_documents, query, vectorstore), _remaining(deadline)
+    )
+    timings["retrieval"] = time.perf_counter() - start
+
+    request = await asyncio.wait_for(
+        asyncio.to_thread(prepare_request, plan, relevant_docs, query_vector), _remaining(deadline)
+    )
+    timings["prompt"] = time.perf_counter() - start - timings["retrieval"]
+    timings["cached"] = request["cached_response"] is not None
+    if request["cached_response"] is not None:
+        timings["first_token"] = timings["total"] = time.perf_counter() - start
+        metrics.record("query.total", timings["total"])
+        yield request["cached_response"]
+        return
+
+    parts = []
+    async for token in _stream_completion(client or get_groq_client(), request["messages"], deadline):
+        if not parts:
+            timings["first_token"] = time.perf_counter() - start
+        parts.append(token)
+        yield token
+    response = "".join(parts)
+    timings.setdefault("first_token", time.perf_counter() - start)
+
+    footer = await asyncio.wait_for(asyncio.to_thread(sources_footer, request, response), _remaining(deadline))
+    if footer:
+        response += footer
+        yield footer
+
+    await asyncio.wait_for(asyncio.to_thread(store_response, request, response), _remaining(deadline))
+    timings["total"] = time.perf_counter() - start
+    metrics.record("query.total", timings["total"])
+
+
+async def aprocess_query(query, conversation_history, vectorstore, client=None, timeout=QUERY_TIMEOUT):
+    """Return (response, per-stage timings in seconds) for a query"""
+    timings = {}
+    parts = []
+    async for piece in astream_query(query, conversation_history, vectorstore, client, timeout, timings):
+        parts.append(piece)
+    return "".join(parts), timings
+
+
+async def run_queries(queries, vectorstore, client=None, concurrency=8, timeout=QUERY_TIMEOUT):
+    """Answer queries headlessly with at most `concurrency` in flight
+
+    Returns one result dict per query, in order, with the response, the
+    per-stage timings and error (None on success); a failed or timed-out
+    query does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(query):
+        async with semaphore:
+            try:
+                response, timings = await aprocess_query(query, [], vectorstore, client, timeout)
+                return {"query": query, "response": response, "timings": timings, "error": None}
+            except Exception as e:
+                return {"query": query, "response": None, "timings": {}, "error": repr(e)}
+
+    return await asyncio.gather(*(run(query) for query in queries))
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import RETRIEVAL_K, QUERY_TIMEOUT
+from utils.answer_cache import SemanticAnswerCache
+from utils.async_query import run_queries
+from utils.course_table import CourseTable, code_token, parse_course_block
+from utils.fakes import FakeEmbeddings, FakeGroq
+from utils.index_sync import make_chunk
+from utils.lexical_index import LexicalIndex, code_tokens, lexical_index_path
+from utils.local_store import LocalVectorStore
+from utils.query_processor import retrieve_documents
+from utils.resources import override_resources
+from utils.source_index import SourceIndex
+
+
+def read_jsonl(path):
+    """Return the records of a JSONL file, skipping blank lines"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(records, path):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def offline_vectorstore(corpus_path=None):
+    """Set up local stand-ins for the LLM and vector store, returning (vectorstore, client)
+
+    The corpus is a JSONL file of {"text", "source"} chunks, or by default the
+    chunks of the persisted lexical index, embedded with FakeEmbeddings into
+    an in-process store. The source index and course table are built in
+    memory from the same chunks (course records from whole-course chunks,
+    page 0). Answers go to FakeGroq and an in-memory answer cache, so nothing
+    reaches the real services or the on-disk caches and indexes. Raises
+    ValueError if the corpus is empty.
+    """
+    if corpus_path:
+        chunks = [
+            make_chunk(record["text"], record.get("source", ""), position, record.get("page", 1))
+            for position, record in enumerate(read_jsonl(corpus_path))
+        ]
+        lexical_index = LexicalIndex()
+        for chunk in chunks:
+            lexical_index.add(chunk)
+    else:
+        lexical_index = LexicalIndex.load(lexical_index_path())
+        chunks = [make_chunk(doc["text"], doc["source"], doc["position"], doc["page"]) for doc in lexical_index.docs]
+    if not chunks:
+        raise ValueError(f"No chunks to index in {corpus_path or lexical_index_path()}")
+    embeddings = FakeEmbeddings()
+    vectorstore = LocalVectorStore(embeddings)
+    vectorstore.upsert(chunks, embeddings.embed_documents([chunk["text"] for chunk in chunks]))
+    source_index = SourceIndex()
+    courses = {}
+    for chunk in chunks:
+        source_index.add_text(chunk["text"], chunk["source"])
+        record = parse_course_block(chunk["text"], chunk["source"]) if chunk["page"] == 0 else None
+        if record:
+            courses[record["code"]] = record
+    course_table = CourseTable(":memory:")
+    course_table.rebuild(courses.values())
+    client = FakeGroq()
+    override_resources(
+        embeddings=embeddings,
+        groq_client=client,
+        lexical_index=lexical_index,
+        source_index=source_index,
+        course_table=course_table,
+        answer_cache=SemanticAnswerCache(path=None),
+    )
+    return vectorstore, client
+
+
+def answer_questions(records, vectorstore, client=None, concurrency=8, timeout=QUERY_TIMEOUT):
+    """Answer {"question": ...} records, returning them with "answer", "timings" and "error" added"""
+    results = asyncio.run(run_queries([record["question"] for record in records], vectorstore, client,
+                                      concurrency, timeout))
+    return [
+        {**record, "answer": result["response"], "timings": result["timings"], "error": result["error"]}
+        for record, result in zip(records, results)
+    ]
+
+
+def score_retrieval(docs, expected_codes):
+    """Return (hit, recall, reciprocal rank) of the expected course codes in ranked documents"""
+    expected = {code_token(code) for code in expected_codes}
+    found = set()
+    first_rank = None
+    for rank, doc in enumerate(docs, start=1):
+        matched = expected & set(code_tokens(doc.page_content))
+        if matched and first_rank is None:
+            first_rank = rank
+        found |= matched
+    return bool(found), len(found) / len(expected), 1.0 / first_rank if first_rank else 0.0
+
+
+def evaluate_retrieval(records, vectorstore, k=RETRIEVAL_K, concurrency=8):
+    """Score retrieval for {"question", "expected_codes"} records
+
+    Returns (per-question results, summary) with hit rate, mean recall and
+    MRR over the top k documents, plus mean retrieval latency.
+    """
+    def evaluate(record):
+        start = time.perf_counter()
+        docs, _ = retrieve_documents(record["question"], vectorstore, k)
+        seconds = time.perf_counter() - start
+        hit, recall, reciprocal_rank = score_retrieval(docs, record["expected_codes"])
+        return {
+            **record,
+            "retrieved": [doc.metadata.get("source") for doc in docs],
+            "hit": hit,
+            "recall": recall,
+            "reciprocal_rank": reciprocal_rank,
+            "seconds": seconds,
+        }
+
+    scored = [record for record in records if record.get("expected_codes")]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(evaluate, scored))
+    count = len(results) or 1
+    summary = {
+        "questions": len(results),
+        "k": k,
+        "hit_rate": sum(result["hit"] for result in results) / count,
+        "recall": sum(result["recall"] for result in results) / count,
+        "mrr": sum(result["reciprocal_rank"] for result in results) / count,
+        "mean_seconds": sum(result["seconds"] for result in results) / count,
+    }
+    return results, summary
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+from config import CATALOG_MANIFEST, CATALOG_ROUTING, LOCAL_INDEX_DIR, PINECONE_NAMESPACE
+from data.course_codes import undergraduate_codes, graduate_codes
+
+# The catalog manifest (data/catalogs.json) declares one entry per catalog year:
+#   name                       academic year, e.g. "2024-2025"
+#   namespace                  vector store namespace (default: derived from the name)
+#   pdf_urls                   the year's PDF catalogs
+#   undergraduate_courses_url  base URL of the course pages, one per subject code
+#   graduate_courses_url
+#   undergraduate_codes        subject codes (default: the lists in data/course_codes.py)
+#   graduate_codes
+#   default                    answers questions that name no year (else the first entry)
+#   enabled                    false keeps an entry in the manifest without serving it
+# Namespaces that are already indexed are served as they are, so adding a new
+# year embeds only that year and old years stay queryable.
+
+# "2023-2024", "2023–24", "2023/24" or a single year
+YEAR_RE = re.compile(r"\b((?:19|20)\d{2})(?:\s*[-–/]\s*((?:19|20)?\d{2}))?\b")
+# Course codes such as "CSE 2050" or "cse2050" are not years
+CODE_LIKE_RE = re.compile(r"\b([A-Za-z]{2,4})\s?\d{4}[A-Za-z]?\b")
+SUBJECTS = set(undergraduate_codes) | set(graduate_codes)
+
+
+def _year_span(name):
+    match = YEAR_RE.search(name)
+    if match is None:
+        raise ValueError(f"Catalog name {name!r} does not contain an academic year")
+    start = int(match.group(1))
+    end = match.group(2)
+    if end is None:
+        return start, start
+    return start, int(end) if len(end) == 4 else start // 100 * 100 + int(end)
+
+
+def load_catalogs(path=CATALOG_MANIFEST):
+    """Return the enabled catalogs of a manifest, with defaults filled in
+
+    Raises ValueError for a manifest without enabled catalogs or with
+    duplicate names or namespaces.
+    """
+    with open(path) as f:
+        entries = json.load(f)["catalogs"]
+    catalogs = []
+    for entry in entries:
+        if not entry.get("enabled", True):
+            continue
+        name = entry["name"]
+        start, end = _year_span(name)
+        catalogs.append({
+            "name": name,
+            "namespace": entry.get("namespace") or f"course_catalog_{start}_{end}",
+            "years": (start, end),
+            "pdf_urls": list(entry.get("pdf_urls", [])),
+            "undergraduate_courses_url": entry.get("undergraduate_courses_url"),
+            "graduate_courses_url": entry.get("graduate_courses_url"),
+            "undergraduate_codes": list(entry.get("undergraduate_codes", undergraduate_codes)),
+            "graduate_codes": list(entry.get("graduate_codes", graduate_codes)),
+            "default": bool(entry.get("default")),
+        })
+    if not catalogs:
+        raise ValueError(f"{path} lists no enabled catalogs")
+    for key in ("name", "namespace"):
+        values = [catalog[key] for catalog in catalogs]
+        if len(set(values)) != len(values):
+            raise ValueError(f"Catalog {key}s in {path} must be unique")
+    if not any(catalog["default"] for catalog in catalogs):
+        catalogs[0]["default"] = True
+    return catalogs
+
+
+def default_catalog(catalogs):
+    return next(catalog for catalog in catalogs if catalog["default"])
+
+
+def find_catalog(catalogs, namespace=None):
+    """Return the catalog stored under `namespace`, or the default catalog"""
+    return next((catalog for catalog in catalogs if catalog["namespace"] == namespace), default_catalog(catalogs))
+
+
+def catalog_pdf_urls(catalog):
+    return list(catalog["pdf_urls"])
+
+
+def catalog_course_urls(catalog):
+    """Return the catalog's course-page URLs, one per subject code"""
+    urls = []
+    for base_url, codes in ((catalog["undergraduate_courses_url"], catalog["undergraduate_codes"]),
+                            (catalog["graduate_courses_url"], catalog["graduate_codes"])):
+        if base_url:
+            urls.extend(f"{base_url}{code}/" for code in codes)
+    return urls
+
+
+def mentioned_years(query):
+    """Return the (start, end) academic years a query names; end is None for a single year"""
+    text = CODE_LIKE_RE.sub(lambda match: " " if match.group(1).lower() in SUBJECTS else match.group(0), query)
+    years = []
+    for match in YEAR_RE.finditer(text):
+        start, end = _year_span(match.group(0))
+        years.append((start, end if match.group(2) else None))
+    return years
+
+
+def route_catalogs(query, catalogs, routing=CATALOG_ROUTING):
+    """Return the catalogs that should answer a query
+
+    A named academic year ("2023-2024") selects that catalog, and a single
+    year every catalog spanning it. Otherwise the default catalog answers,
+    or all of them with routing="all".
+    """
+    named = []
+    for start, end in mentioned_years(query):
+        for catalog in catalogs:
+            first, last = catalog["years"]
+            matches = (first, last) == (start, end) if end is not None else first <= start <= last
+            if matches and catalog not in named:
+                named.append(catalog)
+    if named:
+        return named
+    return list(catalogs) if routing == "all" else [default_catalog(catalogs)]
+
+
+def local_index_dir(namespace=PINECONE_NAMESPACE):
+    """Return the local index directory of a namespace; the default namespace keeps the top level"""
+    return LOCAL_INDEX_DIR if namespace == PINECONE_NAMESPACE else os.path.join(LOCAL_INDEX_DIR, namespace)
+
+
+class CatalogStores:
+    """The vector store of each served catalog, keyed by catalog name
+
+    This is what get_vectorstore() returns; retrieval routes each query
+    between the stores (see utils.retriever.CatalogRetriever).
+    """
+
+    def __init__(self, catalogs, stores):
+        self.catalogs = catalogs
+        self.stores = stores
+
+    def __len__(self):
+        return len(self.stores)
+
+    @property
+    def default(self):
+        return self.stores[default_catalog(self.catalogs)["name"]]
+
+    @property
+    def embeddings(self):
+        return self.default.embeddings
@@ -0,0 +1,273 @@
+import os
+import re
+import sqlite3
+import threading
+from langchain_core.documents import Document
+from config import COURSE_TABLE_PATH, PINECONE_NAMESPACE
+from utils.source_index import COURSE_CODE_RE
+
+# "CSE 3500. Algorithms and Complexity. 3 Credits." / "... (3 credits)" / "Three credits."
+TITLE_RE = re.compile(
+    r"^\s*(?P<code>[A-Z]{2,4}\s\d{4}[A-Z]?)\.?\s+(?P<title>.+?)\.?\s*"
+    r"(?:\(?\s*(?P<credits>[\w.]+(?:\s*(?:-|–|to|or)\s*[\w.]+)?)\s+credits?\s*\)?\.?)?\s*$",
+    re.IGNORECASE,
+)
+# Catalog PDFs start each course entry on its own "CODE. Title" line
+PDF_HEADER_RE = re.compile(r"^(?P<code>[A-Z]{2,4}\s\d{4}[A-Z]?)\.\s+(?P<title>[^\n]+)$", re.MULTILINE)
+CREDITS_RE = re.compile(r"\b(?P<credits>[\w.]+(?:\s*(?:-|–|to|or)\s*[\w.]+)?)\s+credits?\b", re.IGNORECASE)
+PREREQUISITES_RE = re.compile(r"Prerequisites?(?:\s+and\s+Corequisites?)?\s*:?\s*(?P<text>.*?)(?:\.(?:\s|$)|$)", re.IGNORECASE | re.DOTALL)
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+}
+
+
+def code_token(code):
+    """Return the lookup token for a course code, e.g. "cse3500" """
+    return code.replace(" ", "").lower()
+
+
+def _normalize_credits(credits):
+    if not credits:
+        return None
+    return re.sub(r"[A-Za-z]+", lambda m: NUMBER_WORDS.get(m.group(0).lower(), m.group(0)), credits)
+
+
+def _prerequisites(text):
+    """Return (prerequisite sentence, prerequisite course codes) found in text"""
+    match = PREREQUISITES_RE.search(text)
+    if not match:
+        return "", []
+    sentence = " ".join(match.group("text").split())
+    return sentence, list(dict.fromkeys(COURSE_CODE_RE.findall(sentence)))
+
+
+def _record(code, title, credits, body, url):
+    prerequisites, requires = _prerequisites(body)
+    return {
+        "code": " ".join(code.split()),
+        "title": title.strip(),
+        "credits": _normalize_credits(credits),
+        "prerequisites": prerequisites,
+        "requires": [c for c in requires if c != code],
+        "description": " ".join(body.split()),
+        "url": url,
+    }
+
+
+def parse_course_html(html, url):
+    """Extract course records from a catalog course page (CourseLeaf course blocks)"""
+    from bs4 import BeautifulSoup  # Only needed when crawling
+
+    soup = BeautifulSoup(html, "html.parser")
+    records = []
+    for block in soup.select("div.courseblock"):
+        title_el = block.select_one(".courseblocktitle")
+        if title_el is None:
+            continue
+        match = TITLE_RE.match(" ".join(title_el.get_text(" ").split()))
+        if not match:
+            continue
+        title_el.extract()
+        body = block.get_text(" ")
+        credits = match.group("credits")
+        if not credits:
+            credits_match = CREDITS_RE.search(body)
+            credits = credits_match.group("credits") if credits_match else None
+        records.append(_record(match.group("code"), match.group("title"), credits, body, url))
+    return records
+
+
+class CatalogTextParser:
+    """Incremental course-record parser for catalog PDF page texts
+
+    Pages are fed one at a time and entries that continue onto the next page
+    are stitched back together, so a catalog can be parsed while its pages
+    stream by without joining the whole text.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.records = []
+        self._current = None
+
+    def feed(self, text):
+        position = 0
+        for match in PDF_HEADER_RE.finditer(text):
+            if self._current is not None:
+                self._current["body"] += text[position:match.start()]
+                self._finish()
+            self._current = {"code": match.group("code"), "title": match.group("title"), "body": ""}
+            position = match.end()
+        if self._current is not None:
+            self._current["body"] += text[position:]
+
+    def _finish(self):
+        entry = self._current
+        credits_match = CREDITS_RE.search(entry["body"])
+        credits = credits_match.group("credits") if credits_match else None
+        self.records.append(_record(entry["code"], entry["title"].rstrip("."), credits, entry["body"], self.url))
+        self._current = None
+
+    def close(self):
+        """Finish the last entry and return every parsed record"""
+        if self._current is not None:
+            self._finish()
+        return self.records
+
+
+def format_course(record):
+    """Render a course record as one self-contained block of text"""
+    lines = [f"{record['code']}. {record['title']}."]
+    if record.get("credits"):
+        lines.append(f"Credits: {record['credits']}.")
+    if record.get("prerequisites"):
+        lines.append(f"Prerequisites: {record['prerequisites']}.")
+    if record.get("description"):
+        lines.append(record["description"])
+    return "\n".join(lines)
+
+
+def parse_course_block(text, url):
+    """Parse a block rendered by format_course back into a course record, or None"""
+    header, _, rest = text.partition("\n")
+    match = PDF_HEADER_RE.match(header)
+    if not match:
+        return None
+    code = match.group("code")
+    lines = rest.split("\n") if rest else []
+    credits = prerequisites = None
+    if lines and lines[0].startswith("Credits: "):
+        credits = lines.pop(0)[len("Credits: "):].rstrip(".")
+    if lines and lines[0].startswith("Prerequisites: "):
+        prerequisites = lines.pop(0)[len("Prerequisites: "):].rstrip(".")
+    requires = dict.fromkeys(COURSE_CODE_RE.findall(prerequisites or ""))
+    return {
+        "code": code,
+        "title": match.group("title").rstrip("."),
+        "credits": credits,
+        "prerequisites": prerequisites or "",
+        "requires": [c for c in requires if c != code],
+        "description": "\n".join(lines),
+        "url": url,
+    }
+
+
+def course_table_path(namespace=PINECONE_NAMESPACE):
+    """Return the course table of a namespace; the default namespace keeps COURSE_TABLE_PATH"""
+    if namespace == PINECONE_NAMESPACE:
+        return COURSE_TABLE_PATH
+    root, ext = os.path.splitext(COURSE_TABLE_PATH)
+    return f"{root}.{namespace}{ext}"
+
+
+class CourseTable:
+    """SQLite table of course records with a precomputed prerequisite graph
+
+    `courses` holds one row per course. `prerequisites` holds direct edges,
+    and `prerequisite_closure` every transitive prerequisite with its depth,
+    computed once at build time so sequence questions are a single lookup.
+    """
+
+    def __init__(self, path=COURSE_TABLE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS courses ("
+            "token TEXT PRIMARY KEY, code TEXT NOT NULL, title TEXT, credits TEXT, "
+            "prerequisites TEXT, description TEXT, url TEXT);"
+            "CREATE TABLE IF NOT EXISTS prerequisites (course TEXT NOT NULL, requires TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS prerequisite_closure ("
+            "course TEXT NOT NULL, requires TEXT NOT NULL, depth INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS closure_course ON prerequisite_closure (course);"
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+
+    def rebuild(self, records):
+        """Replace the table with the given records and recompute the prerequisite graph"""
+        edges = {}
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM courses")
+            self._conn.execute("DELETE FROM prerequisites")
+            self._conn.execute("DELETE FROM prerequisite_closure")
+            for record in records:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (code_token(record["code"]), record["code"], record["title"], record["credits"],
+                     record["prerequisites"], record["description"], record["url"]),
+                )
+                edges[record["code"]] = record["requires"]
+            self._conn.executemany(
+                "INSERT INTO prerequisites VALUES (?, ?)",
+                [(course, requires) for course, required in edges.items() for requires in required],
+            )
+            # Breadth-first from every course; the first depth a course is reached at wins
+            closure = []
+            for course in edges:
+                seen = {course}
+                frontier = [course]
+                depth = 0
+                while frontier:
+                    depth += 1
+                    next_frontier = []
+                    for node in frontier:
+                        for requires in edges.get(node, []):
+                            if requires not in seen:
+                                seen.add(requires)
+                                next_frontier.append(requires)
+                                closure.append((course, requires, depth))
+                    frontier = next_frontier
+            self._conn.executemany("INSERT INTO prerequisite_closure VALUES (?, ?, ?)", closure)
+
+    def get(self, code):
+        """Return the record for a course code (any spacing or case), or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT code, title, credits, prerequisites, description, url FROM courses WHERE token = ?",
+                (code_token(code),),
+            ).fetchone()
+            if row is None:
+                return None
+            requires = [r for (r,) in self._conn.execute(
+                "SELECT requires FROM prerequisites WHERE course = ?", (row[0],)
+            )]
+        keys = ("code", "title", "credits", "prerequisites", "description", "url")
+        return {**dict(zip(keys, row)), "requires": requires}
+
+    def records(self):
+        """Return every course record, in code order"""
+        with self._lock:
+            codes = [code for (code,) in self._conn.execute("SELECT code FROM courses ORDER BY code")]
+        return [self.get(code) for code in codes]
+
+    def prerequisite_chain(self, code):
+        """Return [(depth, course code)] for every direct and indirect prerequisite"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT depth, requires FROM prerequisite_closure WHERE course = ? ORDER BY depth, requires",
+                (" ".join(code.split()).upper(),),
+            ).fetchall()
+        return [(depth, requires) for depth, requires in rows]
+
+    def documents(self, codes):
+        """Return one Document per known course, with its prerequisite chain appended"""
+        docs = []
+        for code in codes:
+            record = self.get(code)
+            if record is None:
+                continue
+            text = format_course(record)
+            chain = self.prerequisite_chain(record["code"])
+            if chain:
+                levels = {}
+                for depth, requires in chain:
+                    levels.setdefault(depth, []).append(requires)
+                text += "\nPrerequisite chain: " + " <- ".join(
+                    ", ".join(levels[depth]) for depth in sorted(levels)
+                )
+            docs.append(Document(page_content=text, metadata={"source": record["url"], "code": record["code"]}))
+        return docs
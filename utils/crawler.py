@@ -0,0 +1,133 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    CRAWL_MAX_WORKERS,
+    CRAWL_TIMEOUT,
+    CRAWL_MAX_RETRIES,
+    CRAWL_BACKOFF,
+    CRAWL_HOST_INTERVAL,
+)
+from utils.metrics import span
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """Space out requests to the same host by a minimum interval"""
+
+    def __init__(self, min_interval=CRAWL_HOST_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the host of the URL may be contacted again"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def create_session(pool_size=CRAWL_MAX_WORKERS):
+    """Create a requests session with a connection pool sized for the crawler"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_with_retry(session, url, limiter, timeout=CRAWL_TIMEOUT,
+                     max_retries=CRAWL_MAX_RETRIES, backoff=CRAWL_BACKOFF, headers=None):
+    """GET a URL, retrying connection errors and transient statuses with backoff"""
+    for attempt in range(max_retries + 1):
+        limiter.wait(url)
+        try:
+            response = session.get(url, timeout=timeout, headers=headers, stream=True)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            if attempt < max_retries:
+                response.close()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+        if attempt < max_retries:
+            time.sleep(backoff * (2 ** attempt))
+    return response
+
+
+def crawl(urls, handler, status=None, session=None, max_workers=CRAWL_MAX_WORKERS,
+          limiter=None, timeout=CRAWL_TIMEOUT, max_retries=CRAWL_MAX_RETRIES,
+          backoff=CRAWL_BACKOFF, cache=None, failed=None):
+    """Fetch URLs concurrently and yield (url, result) pairs as they complete
+
+    `handler(url, response)` runs in the worker thread and turns the response
+    into a result (None for unusable responses). Responses are streamed, so
+    handlers can spill large bodies to disk instead of reading them whole.
+    Progress is reported through `status` from the calling thread only, since
+    Streamlit elements cannot be updated from worker threads. With a `cache` (see
+    utils.document_loader.ResponseCache) requests are sent conditionally and
+    304 responses are served from disk before reaching the handler.
+
+    URLs that could not be fetched (connection errors, timeouts, or 429/5xx
+    responses that outlasted the retries) or whose handler raised are added
+    to the `failed` set; other statuses, such as a 404 for a removed page,
+    reach the handler as usual.
+    """
+    own_session = session is None
+    session = session or create_session(max_workers)
+    limiter = limiter or HostRateLimiter()
+
+    def work(url):
+        with span("ingest.download"):
+            headers = cache.conditional_headers(url) if cache else None
+            response = fetch_with_retry(session, url, limiter, timeout, max_retries, backoff, headers)
+            if response.status_code in RETRY_STATUS_CODES:
+                response.close()
+                raise requests.HTTPError(f"{response.status_code} after {max_retries} retries", response=response)
+            resolved = response
+            try:
+                resolved = cache.resolve(url, response) if cache else response
+                return handler(url, resolved)
+            finally:
+                # Bodies are streamed; closing returns the connection to the pool
+                # (and lets the cache evict a cached body nobody has retained)
+                resolved.close()
+                response.close()
+
+    total = len(urls)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(work, url): url for url in urls}
+        for done, future in enumerate(as_completed(futures), start=1):
+            url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = None
+                if failed is not None:
+                    failed.add(url)
+                if status:
+                    status.update(label=f"[{done}/{total}] Error fetching {url}: {e}")
+            else:
+                if status:
+                    mark = "✅ Processed" if result else "❌ Failed to download"
+                    status.update(label=f"[{done}/{total}] {mark}: {url}")
+            yield url, result
+    finally:
+        # If the consumer stopped early (e.g. an upsert failed), drop the queued
+        # downloads rather than waiting for all of them
+        executor.shutdown(wait=False, cancel_futures=True)
+        if cache:
+            cache.flush()
+        if own_session:
+            session.close()
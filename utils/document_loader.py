@@ -1,61 +1,260 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
 import requests
-import fitz  # PyMuPDF for PDFs
-import streamlit as st
 from bs4 import BeautifulSoup
-from data.urls import pdf_urls, undergraduate_courses_url, graduate_courses_url
-from data.course_codes import undergraduate_codes, graduate_codes
-
-def get_pdf_urls():
-    """Return list of PDF URLs"""
-    return pdf_urls
-
-def get_course_urls():
-    """Construct and return list of course URLs"""
-    dynamic_urls = []
-    for code in undergraduate_codes:
-        url = f"{undergraduate_courses_url}{code}/"
-        dynamic_urls.append(url)
-    for code in graduate_codes:
-        url = f"{graduate_courses_url}{code}/"
-        dynamic_urls.append(url)
-    return dynamic_urls
-
-def download_pdf(url, status):
-    """Download and extract text from PDF"""
-    status.update(label=f"Downloading PDF: {url}")
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            pdf_bytes = response.content
-            # Open PDF from bytes using PyMuPDF
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text("text") + "\n\n"
-            status.update(label=f"✅ Processed PDF: {url}")
-            return text
-        else:
-            status.update(label=f"❌ Failed to download PDF: {url}")
-            return None
-    except Exception as e:
-        status.update(label=f"Error processing PDF {url}: {e}")
-        return None
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+from utils.catalogs import catalog_course_urls, catalog_pdf_urls, default_catalog
+from utils.metrics import increment
+from utils.pdf_extract import iter_response_pdf_pages
+from utils.resources import get_catalogs
+
+def get_pdf_urls(catalog=None):
+    """Return list of PDF URLs of a catalog (default: the default catalog)"""
+    return catalog_pdf_urls(catalog or default_catalog(get_catalogs()))
+
+def get_course_urls(catalog=None):
+    """Construct and return list of course URLs of a catalog (default: the default catalog)"""
+    return catalog_course_urls(catalog or default_catalog(get_catalogs()))
+
+class CachedResponse(requests.Response):
+    """A 200 response whose body lives in a cache file and is read on demand
+
+    The cache keeps the file until the response is closed. A reader that
+    outlives the caller's close() (e.g. lazy PDF extraction) calls retain()
+    first and close() once done; `release` runs on the last close.
+    """
+
+    def __init__(self, url, body_path, headers, encoding, release=None):
+        super().__init__()
+        self.status_code = 200
+        self.url = url
+        self.body_path = body_path
+        self.headers = headers
+        self.encoding = encoding
+        self._release = release
+        self._holds = 1
+
+    def retain(self):
+        self._holds += 1
+
+    def close(self):
+        self._holds -= 1
+        if self._holds == 0 and self._release:
+            self._release()
+            self._release = None
+
+    @property
+    def content(self):
+        if self._content is False:
+            with open(self.body_path, "rb") as f:
+                self._content = f.read()
+        return self._content
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        with open(self.body_path, "rb") as f:
+            while block := f.read(chunk_size):
+                yield block
+
+class ResponseCache:
+    """On-disk HTTP response cache revalidated with conditional GETs
+
+    Entries are keyed by URL and record the ETag, Last-Modified and SHA-256 of
+    the body. Bodies are stored once per content hash, and the least recently
+    used entries are evicted when the total size exceeds `max_bytes`; bodies
+    held open by a CachedResponse are never evicted, and a body larger than
+    `max_bytes` is served once without being cached.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.bodies_dir = os.path.join(cache_dir, "bodies")
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.stats = {"hits": 0, "misses": 0, "bytes_downloaded": 0, "bytes_from_cache": 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._open = {}  # Body digest -> number of CachedResponses reading it
+        try:
+            with open(self.index_path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _body_path(self, digest):
+        return os.path.join(self.bodies_dir, digest)
+
+    def conditional_headers(self, url):
+        """Return validator headers for a conditional request, if the URL is cached"""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry or not os.path.exists(self._body_path(entry["sha256"])):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def resolve(self, url, response):
+        """Serve a 304 from disk or store a fresh 200, returning the usable response
 
-def download_webpage(url, status):
-    """Download and extract text from webpage"""
-    status.update(label=f"Downloading webpage: {url}")
-    try:
-        response = requests.get(url)
+        Bodies are streamed to disk rather than read into memory, and the
+        returned response reads its body back from the cache file on demand.
+        Close it when done so its body can be evicted again.
+        """
+        if response.status_code == 304:
+            with self._lock:
+                entry = self._entries.get(url)
+                if entry:
+                    entry["last_access"] = time.time()
+                    self.stats["hits"] += 1
+                    self.stats["bytes_from_cache"] += entry["size"]
+                    increment("http.cache_hits")
+                    increment("http.bytes_from_cache", entry["size"])
+                    self._dirty = True
+                    self._pin(entry["sha256"])
+            if entry:
+                return self._cached_response(url, entry, response.headers)
         if response.status_code == 200:
-            html_content = response.text
-            soup = BeautifulSoup(html_content, "html.parser")
-            # Extract visible text from the webpage
-            text = soup.get_text(separator="\n")
-            status.update(label=f"✅ Processed webpage: {url}")
-            return text
-        else:
-            status.update(label=f"❌ Failed to download webpage: {url}")
-            return None
-    except Exception as e:
-        status.update(label=f"Error processing webpage {url}: {e}")
-        return None
\ No newline at end of file
+            length = response.headers.get("Content-Length", "")
+            if length.isdigit() and int(length) > self.max_bytes:
+                return response  # Too big to cache; the caller streams it as usual
+            return self._store(url, response)
+        return response
+
+    def _pin(self, digest):
+        # Called with the lock held
+        self._open[digest] = self._open.get(digest, 0) + 1
+
+    def _unpin(self, digest):
+        with self._lock:
+            self._open[digest] -= 1
+            if not self._open[digest]:
+                del self._open[digest]
+                self._drop_unused_body(digest)
+
+    def _drop_unused_body(self, digest):
+        # Called with the lock held; a body still open is dropped by its last _unpin()
+        if digest not in self._open and not any(e["sha256"] == digest for e in self._entries.values()):
+            self._remove_body(digest)
+
+    def _replace_entry(self, url, entry):
+        # Called with the lock held; None forgets the URL
+        previous = self._entries.pop(url, None) if entry is None else self._entries.get(url)
+        if entry is not None:
+            self._entries[url] = entry
+        self._dirty = True
+        if previous and previous["sha256"] != (entry or {}).get("sha256"):
+            self._drop_unused_body(previous["sha256"])
+
+    def _cached_response(self, url, entry, headers):
+        digest = entry["sha256"]
+        return CachedResponse(url, self._body_path(digest), headers, entry.get("encoding"),
+                              release=lambda: self._unpin(digest))
+
+    def _store(self, url, response):
+        """Stream a response body into the cache, returning a response that reads it back"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.bodies_dir)
+        with os.fdopen(fd, "wb") as f:
+            for block in response.iter_content(1024 * 1024):
+                digest.update(block)
+                size += len(block)
+                f.write(block)
+        digest = digest.hexdigest()
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_downloaded"] += size
+        increment("http.cache_misses")
+        increment("http.bytes_downloaded", size)
+        if size > self.max_bytes:
+            # Caching it would evict everything else; serve this copy and drop it
+            with self._lock:
+                self._replace_entry(url, None)
+            return CachedResponse(url, tmp_path, response.headers, response.encoding,
+                                  release=lambda: self._remove_path(tmp_path))
+        os.replace(tmp_path, self._body_path(digest))
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest,
+            "size": size,
+            "encoding": response.encoding,
+            "last_access": time.time(),
+        }
+        with self._lock:
+            self._pin(digest)
+            self._replace_entry(url, entry)
+            self._evict()
+        return self._cached_response(url, entry, response.headers)
+
+    def _evict(self):
+        """Drop least recently used entries until the stored bodies fit the cap
+
+        Entries whose body is open (including the one just stored) are
+        skipped; the cap is enforced again on a later store.
+        """
+        sizes = {e["sha256"]: e["size"] for e in self._entries.values()}
+        total = sum(sizes.values())
+        for url, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            digest = entry["sha256"]
+            if digest in self._open:
+                continue
+            del self._entries[url]
+            if not any(e["sha256"] == digest for e in self._entries.values()):
+                total -= sizes[digest]
+                self._remove_body(digest)
+
+    def _remove_body(self, digest):
+        self._remove_path(self._body_path(digest))
+
+    def _remove_path(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def invalidate(self, url=None):
+        """Forget one URL, or the whole cache when no URL is given"""
+        with self._lock:
+            urls = [url] if url else list(self._entries)
+            for key in urls:
+                self._replace_entry(key, None)
+        self.flush()
+
+    def flush(self):
+        """Write the cache index to disk if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+def extract_webpage_text(html_content):
+    """Extract visible text from webpage HTML"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    return soup.get_text(separator="\n")
+
+def extract_pages(url, response):
+    """Extract (page_number, text) pairs from a crawled response; webpages are one page
+
+    PDF pages come back as a lazy iterator that extracts page ranges in
+    worker processes, so the caller streams them in page order.
+    """
+    if response.status_code != 200:
+        return None
+    if url.lower().endswith(".pdf"):
+        return ((number, text) for number, text in iter_response_pdf_pages(response) if text.strip())
+    return [(1, extract_webpage_text(response.text))]
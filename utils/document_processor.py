@@ -1,71 +1,93 @@
-import re
-import streamlit as st
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from utils.document_loader import download_pdf, download_webpage, get_pdf_urls, get_course_urls
+from utils.crawler import crawl
+from utils.course_table import CatalogTextParser, format_course, parse_course_html
+from utils.document_loader import ResponseCache, extract_pages, get_pdf_urls, get_course_urls
+from utils.index_sync import make_chunk
+from utils.metrics import increment
+from utils.resources import SharedResource
+from utils.source_index import SourceIndex
 
-def extract_doc_ids(text, url):
-    """Extract document IDs for tracking source URLs"""
-    # Extract course codes or unique identifiers from the text
-    # This is a simplified version - in practice, you'd need a more robust pattern
-    course_codes = re.findall(r'\b[A-Z]{2,4}\s\d{4}[A-Z]?\b', text)
-    doc_id_to_url = {}
-    for course_code in course_codes:
-        doc_id_to_url[course_code] = url
-    return doc_id_to_url
+def extract_document(url, response):
+    """Extract pages and structured course records from a crawled response
 
-def process_documents(status):
-    """Process all documents and return text chunks and source mapping"""
-    all_texts = []
-    doc_sources = {}
+    PDF pages are returned as a lazy iterator with a parser to feed them to;
+    webpage records are parsed right away.
+    """
+    pages = extract_pages(url, response)
+    if pages is None:
+        return None
+    if url.lower().endswith(".pdf"):
+        return pages, CatalogTextParser(url)
+    return pages, parse_course_html(response.text, url)
 
-    # Process PDF URLs
-    pdf_urls = get_pdf_urls()
-    for url in pdf_urls:
-        text = download_pdf(url, status)
-        if text:
-            all_texts.append(text)
-            doc_sources.update(extract_doc_ids(text, url))
+def iter_pages(urls, status, source_index, courses, cache=None, failed=None):
+    """Yield page records as downloads complete
 
-    # Process dynamic webpage URLs constructed from course codes
-    dynamic_urls = get_course_urls()
-    for url in dynamic_urls:
-        text = download_webpage(url, status)
-        if text:
-            all_texts.append(text)
-            doc_sources.update(extract_doc_ids(text, url))
+    Course codes are recorded in source_index and course records in the
+    courses dict. Records from course pages take precedence over the PDF
+    catalogs, and each one is also yielded as a whole-course page (page 0)
+    so a course is retrievable as a single unit. URLs that could not be
+    fetched are added to the `failed` set (see crawl); a page that is gone
+    (e.g. 404) is not a failure, so its chunks are removed from the index.
+    """
+    # Fetch the PDFs and the dynamic webpage URLs constructed from course codes
+    # concurrently; pages are handed on while later downloads are in flight
+    status.update(label=f"Downloading {len(urls)} documents...")
+    documents = 0
+    characters = 0
+    for url, document in crawl(urls, extract_document, status, cache=cache, failed=failed):
+        if not document:
+            continue
+        pages, records = document
+        parser = records if isinstance(records, CatalogTextParser) else None
+        documents += 1
+        increment("ingest.documents")
+        for page, text in pages:
+            characters += len(text)
+            increment("ingest.pages")
+            increment("ingest.characters", len(text))
+            source_index.add_text(text, url)
+            if parser:
+                parser.feed(text)
+            yield {"source": url, "page": page, "text": text}
+        if parser:
+            for record in parser.close():
+                courses.setdefault(record["code"], record)
+        else:
+            for position, record in enumerate(records):
+                courses[record["code"]] = record
+                yield {"source": url, "page": 0, "position": position, "text": format_course(record), "whole": True}
+    status.update(label=f"Extracted {characters} characters of text and {len(courses)} courses from {documents} sources.")
 
-    # Save source mapping in session state
-    st.session_state.source_urls = doc_sources
+def iter_chunks(pages, chunk_size=500, chunk_overlap=50):
+    """Split each page separately and lazily yield chunk records"""
+    # Chunks never mix unrelated documents and keep their source URL and page
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-    if not all_texts:
-        status.update(label="No text was extracted from the provided sources.", state="error")
-        return None, None
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for page in pages:
+        if page.get("whole"):
+            increment("ingest.chunks")
+            yield make_chunk(page["text"], page["source"], page["position"], page["page"])
+            continue
+        for position, chunk_text in enumerate(splitter.split_text(page["text"])):
+            increment("ingest.chunks")
+            yield make_chunk(chunk_text, page["source"], position, page["page"])
 
-    # Combine all extracted texts
-    combined_text = "\n\n".join(all_texts)
-    status.update(label=f"Extracted {len(combined_text)} characters of text from all sources.")
+# One HTTP cache per process, so catalogs crawled in parallel share its index
+_response_cache = SharedResource(ResponseCache)
 
-    # Split the text into chunks
-    status.update(label="Splitting text into manageable chunks...")
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_text(combined_text)
-    status.update(label=f"Text split into {len(chunks)} chunks.")
+def process_documents(status, catalog=None):
+    """Return a lazy stream of a catalog's text chunks plus the source index,
+    course records (code -> record) and set of failed URLs it fills in
 
-    return chunks, doc_sources
-
-def identify_source_urls(content):
-    """Identify potential source URLs based on content"""
-    urls = []
-    for code, url in st.session_state.source_urls.items():
-        if code in content:
-            urls.append((code, url))
-    
-    # If no specific course codes found, return most relevant URLs
-    if not urls:
-        pdf_urls = get_pdf_urls()
-        if "undergraduate" in content.lower():
-            urls.append(("Undergraduate Catalog", pdf_urls[0]))
-        if "graduate" in content.lower():
-            urls.append(("Graduate Catalog", pdf_urls[1]))
-    
-    return list(set(urls))[:3]  # Return up to 3 unique sources
\ No newline at end of file
+    Nothing is downloaded until the chunk generator is consumed; the other
+    three are complete once the generator is exhausted. Without a catalog,
+    the default catalog is processed.
+    """
+    source_index = SourceIndex()
+    courses = {}
+    failed = set()
+    urls = get_pdf_urls(catalog) + get_course_urls(catalog)
+    cache = _response_cache.get()
+    chunks = iter_chunks(iter_pages(urls, status, source_index, courses, cache, failed))
+    return chunks, source_index, courses, failed
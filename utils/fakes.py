@@ -0,0 +1,99 @@
+# Local stand-ins for the embedding model and vector store that run without
+# API keys or network access (offline development, tests and benchmarks)
+import hashlib
+import math
+import re
+import threading
+import time
+from types import SimpleNamespace
+from langchain_core.embeddings import Embeddings
+from config import EMBEDDING_DIMENSION
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic feature-hashing embeddings
+
+    Each word is hashed to a signed dimension, so texts that share words get
+    similar vectors and retrieval behaves sensibly without the real model.
+    """
+
+    def __init__(self, dimension=EMBEDDING_DIMENSION, latency=0.0):
+        self.dimension = dimension
+        self.latency = latency  # Seconds slept per call, to simulate the API
+        self.calls = 0
+
+    def _embed(self, text):
+        values = [0.0] * self.dimension
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.sha256(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            values[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._embed(text)
+
+
+class InMemoryIndex:
+    """Vector store stand-in exposing the upsert/delete interface used by index sync"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency  # Seconds slept per call, to simulate the network
+        self.vectors = {}
+        self.records = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, chunks, vectors):
+        time.sleep(self.latency)
+        with self._lock:
+            for chunk, vector in zip(chunks, vectors):
+                self.vectors[chunk["id"]] = vector
+                self.records[chunk["id"]] = chunk
+
+    def delete(self, ids):
+        time.sleep(self.latency)
+        with self._lock:
+            for chunk_id in ids:
+                self.vectors.pop(chunk_id, None)
+                self.records.pop(chunk_id, None)
+
+    def __len__(self):
+        return len(self.vectors)
+
+
+class FakeGroq:
+    """Groq client stand-in that answers with a fixed reply
+
+    Mirrors `client.chat.completions.create`: with stream=True it yields
+    chunks carrying `choices[0].delta.content`, otherwise it returns one
+    completion carrying `choices[0].message.content`.
+    """
+
+    def __init__(self, reply="This is a stubbed answer about CSE 3500.", latency=0.0, token_latency=0.0):
+        self.reply = reply
+        self.latency = latency  # Seconds before the first token
+        self.token_latency = token_latency  # Seconds between streamed tokens
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, stream=False, **kwargs):
+        self.requests.append({"messages": messages, "stream": stream, **kwargs})
+        time.sleep(self.latency)
+        if not stream:
+            message = SimpleNamespace(content=self.reply)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self._stream()
+
+    def _stream(self):
+        for token in re.findall(r"\S+\s*", self.reply):
+            time.sleep(self.token_latency)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))])
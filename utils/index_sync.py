@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+from config import INDEX_MANIFEST_DIR
+from utils.ingest_pipeline import run_ingest
+from utils.metrics import increment, span
+
+
+def content_hash(text):
+    """Return the SHA-256 hex digest of a chunk's text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source, page, position, text):
+    """Build a stable vector ID from a chunk's source URL, position and content"""
+    key = f"{source}#{page}.{position}:{content_hash(text)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def make_chunk(text, source, position, page=1):
+    """Create a chunk record with its deterministic ID and content hash"""
+    return {
+        "id": chunk_id(source, page, position, text),
+        "text": text,
+        "source": source,
+        "page": page,
+        "position": position,
+        "hash": content_hash(text),
+    }
+
+
+def manifest_path(namespace, manifest_dir=INDEX_MANIFEST_DIR):
+    """Return the local manifest path for a vector store namespace"""
+    return os.path.join(manifest_dir, f"{namespace}.json")
+
+
+def load_manifest(path):
+    """Load the manifest of indexed chunk IDs, or an empty one if missing
+
+    Batches committed by an interrupted sync are replayed from the journal
+    next to the manifest, so the next run resumes after the last of them.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    try:
+        with open(f"{path}.journal") as f:
+            for line in f:
+                try:
+                    manifest.update(json.loads(line))
+                except ValueError:
+                    break  # A torn final line from a crash; later batches were not committed
+    except OSError:
+        pass
+    return manifest
+
+
+def sync_interrupted(path):
+    """Return True if a sync committed batches to the journal but never finished"""
+    try:
+        return os.path.getsize(f"{path}.journal") > 0
+    except OSError:
+        return False
+
+
+def save_manifest(manifest, path):
+    """Atomically write the manifest of indexed chunk IDs and clear the journal"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+    try:
+        os.remove(f"{path}.journal")
+    except OSError:
+        pass
+
+
+def _manifest_entry(chunk):
+    return {"source": chunk["source"], "hash": chunk["hash"]}
+
+
+def sync_chunks(chunks, embeddings, store, path, status=None, failed_sources=(), **pipeline_options):
+    """Bring a vector store in line with the current chunks
+
+    Only chunks whose IDs are not in the manifest are embedded and upserted,
+    and IDs that are no longer produced are deleted. Because IDs include the
+    content hash, an edited chunk shows up as one new ID plus one stale ID.
+    `store` needs `upsert(chunks, vectors)` and `delete(ids)`. Each upserted
+    batch is appended to the journal, so a failed run resumes from its last
+    committed batch; stale IDs are only deleted after every upsert succeeded.
+
+    Chunks of the sources in `failed_sources` (URLs whose download failed
+    this run) are kept as they are rather than treated as stale. The
+    collection is read once `chunks` is exhausted, so it may be filled in
+    while the chunks are produced (see process_documents).
+    """
+    manifest = load_manifest(path)
+    indexed = set(manifest)
+    current = {}
+
+    def pending():
+        for chunk in chunks:
+            current[chunk["id"]] = _manifest_entry(chunk)
+            if chunk["id"] not in indexed:
+                yield chunk
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.journal", "a") as journal:
+        def commit(batch):
+            journal.write(json.dumps({chunk["id"]: _manifest_entry(chunk) for chunk in batch}) + "\n")
+            journal.flush()
+
+        total = len(chunks) if isinstance(chunks, list) else None
+        run_ingest(pending(), embeddings, store, status, on_commit=commit, total=total, **pipeline_options)
+
+    if not current:
+        # Nothing was extracted (e.g. every download failed); keep the index as it is
+        return {"added": 0, "deleted": 0, "unchanged": 0}
+
+    added = len([key for key in current if key not in indexed])
+    failed_sources = set(failed_sources)
+    stale_ids = []
+    for key, entry in manifest.items():
+        if key in current:
+            continue
+        if entry.get("source") in failed_sources:
+            current[key] = entry
+        else:
+            stale_ids.append(key)
+    if status:
+        status.update(label=(
+            f"Index sync: {added} new or changed chunks, "
+            f"{len(stale_ids)} stale, {len(current) - added} unchanged."
+        ))
+    if stale_ids:
+        with span("ingest.delete_stale"):
+            store.delete(stale_ids)
+    increment("ingest.added", added)
+    increment("ingest.deleted", len(stale_ids))
+
+    save_manifest(current, path)
+    return {"added": added, "deleted": len(stale_ids), "unchanged": len(current) - added}
@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from config import INGEST_BATCH_SIZE, INGEST_EMBED_WORKERS, INGEST_UPSERT_WORKERS, INGEST_QUEUE_SIZE
+from utils.metrics import increment, span
+
+_DONE = object()
+
+
+def _put(q, item, stop):
+    """Put an item on a bounded queue, giving up if the pipeline is stopping"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    """Get an item from a queue, returning _DONE if the pipeline is stopping"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _batches(chunks, batch_size):
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_ingest(chunks, embeddings, store, status=None, on_commit=None, total=None,
+               batch_size=INGEST_BATCH_SIZE, embed_workers=INGEST_EMBED_WORKERS,
+               upsert_workers=INGEST_UPSERT_WORKERS, queue_size=INGEST_QUEUE_SIZE):
+    """Embed and upsert chunks through bounded, multi-worker stages
+
+    Chunks (any iterable, consumed lazily) are grouped into batches that flow
+    from the calling thread to embed workers to upsert workers over bounded
+    queues, so a slow stage blocks the one before it instead of buffering
+    everything in memory. The chunk iterable, `status` and
+    `on_commit(batch)` are only touched from the calling thread; `on_commit`
+    runs after each batch is upserted and is where callers checkpoint progress
+    for resuming. Any worker error stops the pipeline and is re-raised here.
+    """
+    embed_queue = queue.Queue(maxsize=queue_size)
+    upsert_queue = queue.Queue(maxsize=queue_size)
+    done_queue = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts = {"embedded": 0, "embed_left": embed_workers, "upsert_left": upsert_workers}
+
+    def fail(exc):
+        done_queue.put(exc)
+        stop.set()
+
+    def embed():
+        try:
+            while (batch := _get(embed_queue, stop)) is not _DONE:
+                with span("ingest.embed_batch"):
+                    vectors = embeddings.embed_documents([chunk["text"] for chunk in batch])
+                with lock:
+                    counts["embedded"] += len(batch)
+                if not _put(upsert_queue, (batch, vectors), stop):
+                    return
+        except Exception as e:
+            fail(e)
+        finally:
+            with lock:
+                counts["embed_left"] -= 1
+                last = counts["embed_left"] == 0
+            if last:
+                for _ in range(upsert_workers):
+                    _put(upsert_queue, _DONE, stop)
+
+    def upsert():
+        try:
+            while (item := _get(upsert_queue, stop)) is not _DONE:
+                batch, vectors = item
+                with span("ingest.upsert_batch"):
+                    store.upsert(batch, vectors)
+                increment("ingest.vectors", len(batch))
+                done_queue.put(batch)
+        except Exception as e:
+            fail(e)
+        finally:
+            with lock:
+                counts["upsert_left"] -= 1
+                last = counts["upsert_left"] == 0
+            if last:
+                done_queue.put(_DONE)
+
+    threads = [threading.Thread(target=embed, daemon=True) for _ in range(embed_workers)]
+    threads += [threading.Thread(target=upsert, daemon=True) for _ in range(upsert_workers)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    state = {"committed": 0, "error": None, "finished": False}
+
+    def drain(block):
+        """Commit finished batches; with block=True wait for one event"""
+        while not state["finished"]:
+            try:
+                item = done_queue.get(timeout=0.1) if block else done_queue.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            if item is _DONE:
+                state["finished"] = True
+            elif isinstance(item, Exception):
+                state["error"] = state["error"] or item
+            else:
+                if on_commit:
+                    on_commit(item)
+                state["committed"] += len(item)
+                if status:
+                    elapsed = max(time.perf_counter() - start, 1e-9)
+                    committed = state["committed"]
+                    progress = f"{committed}/{total}" if total is not None else str(committed)
+                    status.update(label=(
+                        f"Upserted {progress} vectors "
+                        f"({counts['embedded'] / elapsed:.1f} chunks/s embedded, "
+                        f"{committed / elapsed:.1f} vectors/s upserted)"
+                    ))
+
+    def feed(item):
+        """Put an item on the embed queue, committing finished batches while blocked"""
+        while not stop.is_set():
+            try:
+                embed_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                drain(block=False)
+        return False
+
+    try:
+        for batch in _batches(chunks, batch_size):
+            drain(block=False)
+            if not feed(batch):
+                break
+        for _ in range(embed_workers):
+            feed(_DONE)
+        while not state["finished"]:
+            drain(block=True)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if state["error"]:
+        raise state["error"]
+
+    elapsed = time.perf_counter() - start
+    committed = state["committed"]
+    return {
+        "vectors": committed,
+        "seconds": elapsed,
+        "vectors_per_second": committed / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,158 @@
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from langchain_core.documents import Document
+from config import VECTOR_BACKEND, INDEX_MANIFEST_DIR, PINECONE_NAMESPACE, RRF_K
+from data.course_codes import undergraduate_codes, graduate_codes
+from utils.catalogs import local_index_dir
+from utils.metrics import span
+
+WORD_RE = re.compile(r"\w+")
+# Course codes as users type them too, e.g. "cse 3500" or "CSE3500"
+CODE_RE = re.compile(r"\b([A-Za-z]{2,4})\s?(\d{4}[A-Za-z]?)\b")
+SUBJECTS = set(undergraduate_codes) | set(graduate_codes)
+
+
+def code_tokens(text):
+    """Return one joined token per course code in text, e.g. "cse3500"
+
+    Only known subject codes count, so phrases like "for 2024" are ignored.
+    """
+    return [
+        f"{subject}{number}".lower()
+        for subject, number in CODE_RE.findall(text)
+        if subject.lower() in SUBJECTS
+    ]
+
+
+def tokenize(text):
+    """Split text into lowercase words plus one joined token per course code"""
+    return WORD_RE.findall(text.lower()) + code_tokens(text)
+
+
+def lexical_index_path(namespace=PINECONE_NAMESPACE):
+    """Return where the lexical index is persisted, next to the vectors it mirrors"""
+    if VECTOR_BACKEND != "pinecone":
+        return os.path.join(local_index_dir(namespace), "lexical.json")
+    return os.path.join(INDEX_MANIFEST_DIR, f"{namespace}.lexical.json")
+
+
+class LexicalIndex:
+    """BM25 inverted index over the same chunks as the vector store"""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []
+        self.lengths = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, chunk):
+        row = len(self.docs)
+        tokens = tokenize(chunk["text"])
+        self.docs.append({key: chunk.get(key) for key in ("id", "text", "source", "page", "position")})
+        self.lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, []).append((row, tf))
+
+    def indexing(self, chunks):
+        """Add each chunk to the index as it passes through a chunk stream"""
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def _document(self, row):
+        doc = self.docs[row]
+        metadata = {key: doc[key] for key in ("source", "page", "position")}
+        return Document(id=doc["id"], page_content=doc["text"], metadata=metadata)
+
+    def search(self, query, k=5, terms=None):
+        """Return the top k (document, BM25 score) pairs for a query"""
+        if not self.docs:
+            return []
+        terms = terms if terms is not None else tokenize(query)
+        count = len(self.docs)
+        average_length = sum(self.lengths) / count
+        scores = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row, tf in postings:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[row] / average_length)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (self.k1 + 1) / norm
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self._document(row), score) for row, score in top]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"docs": self.docs, "lengths": self.lengths, "postings": self.postings}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or an empty one if there is none"""
+        index = cls()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        index.docs = data["docs"]
+        index.lengths = data["lengths"]
+        index.postings = {term: [tuple(p) for p in postings] for term, postings in data["postings"].items()}
+        return index
+
+
+def _doc_key(doc):
+    return doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(result_lists, k=5, rrf_k=RRF_K):
+    """Merge ranked document lists, scoring each document by sum(1 / (rrf_k + rank))"""
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:k]]
+
+
+def hybrid_search(query, vectorstore, lexical_index, k=5, query_vector=None):
+    """Retrieve with BM25 and vector search fused by reciprocal rank
+
+    Returns (documents, query_vector). Queries naming course codes that the
+    lexical index knows are answered from it directly, skipping the embedding
+    call, in which case query_vector is None. A query_vector that is passed
+    in is used instead of embedding the query again.
+    """
+    if lexical_index is not None and len(lexical_index):
+        codes = code_tokens(query)
+        if codes:
+            with span("query.lexical_search"):
+                code_hits = lexical_index.search(query, k, terms=codes)
+            if code_hits:
+                return [doc for doc, _ in code_hits], None
+
+    if query_vector is None:
+        with span("query.embed"):
+            query_vector = vectorstore.embeddings.embed_query(query)
+    with span("query.vector_search"):
+        vector_docs = vectorstore.similarity_search_by_vector(query_vector, k=k)
+    if lexical_index is None or not len(lexical_index):
+        return vector_docs, query_vector
+    with span("query.lexical_search"):
+        lexical_docs = [doc for doc, _ in lexical_index.search(query, k)]
+    return reciprocal_rank_fusion([vector_docs, lexical_docs], k), query_vector
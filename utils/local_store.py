@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from config import EMBEDDING_DIMENSION, LOCAL_INDEX_TYPE
+from utils.index_sync import make_chunk
+
+# Metadata kept alongside each vector; "text" becomes the document content
+RECORD_FIELDS = ("source", "page", "position", "hash")
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorStore(VectorStore):
+    """In-process cosine-similarity vector store backed by NumPy or FAISS
+
+    Vectors are held as a normalized float32 matrix, so cosine similarity is a
+    single matrix-vector product. With backend="faiss" searches go through a
+    FAISS index ("flat" for exact search, "hnsw" for approximate) that is
+    rebuilt lazily after writes. The store implements the `upsert`/`delete`
+    interface used by index sync, and can be saved to and loaded from disk.
+    """
+
+    def __init__(self, embedding, dimension=EMBEDDING_DIMENSION, backend="numpy",
+                 index_type=LOCAL_INDEX_TYPE):
+        self._embedding = embedding
+        self.dimension = dimension
+        self.backend = backend
+        self.index_type = index_type
+        self._ids = []
+        self._positions = {}
+        self._records = []
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._faiss_index = None
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def ids(self):
+        with self._lock:
+            return list(self._ids)
+
+    def upsert(self, chunks, vectors):
+        """Insert or replace chunk records and their vectors"""
+        vectors = _normalize(vectors).reshape(-1, self.dimension)
+        with self._lock:
+            appended = []
+            for chunk, vector in zip(chunks, vectors):
+                record = {"text": chunk["text"], **{key: chunk.get(key) for key in RECORD_FIELDS}}
+                row = self._positions.get(chunk["id"])
+                if row is None:
+                    self._positions[chunk["id"]] = len(self._ids)
+                    self._ids.append(chunk["id"])
+                    self._records.append(record)
+                    appended.append(vector)
+                else:
+                    self._records[row] = record
+                    self._matrix[row] = vector
+            if appended:
+                self._matrix = np.vstack([self._matrix, np.stack(appended)])
+            self._faiss_index = None
+
+    def delete(self, ids=None, **kwargs):
+        """Remove vectors by ID"""
+        with self._lock:
+            drop = {self._positions[key] for key in ids or [] if key in self._positions}
+            if not drop:
+                return True
+            keep = [row for row in range(len(self._ids)) if row not in drop]
+            self._ids = [self._ids[row] for row in keep]
+            self._records = [self._records[row] for row in keep]
+            self._matrix = self._matrix[keep]
+            self._positions = {key: row for row, key in enumerate(self._ids)}
+            self._faiss_index = None
+        return True
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        chunks = []
+        for i, (text, metadata) in enumerate(zip(texts, metadatas)):
+            chunk = make_chunk(text, metadata.get("source", ""), metadata.get("position", i), metadata.get("page", 1))
+            if ids:
+                chunk["id"] = ids[i]
+            chunks.append(chunk)
+        self.upsert(chunks, self._embedding.embed_documents(texts))
+        return [chunk["id"] for chunk in chunks]
+
+    def vectors_for(self, ids):
+        """Return (chunk records with IDs, normalized vectors) for the given IDs"""
+        with self._lock:
+            rows = [self._positions[key] for key in ids if key in self._positions]
+            chunks = [{"id": self._ids[row], **self._records[row]} for row in rows]
+            return chunks, self._matrix[rows]
+
+    def _get_faiss_index(self):
+        import faiss
+
+        if self._faiss_index is None:
+            if self.index_type == "hnsw":
+                index = faiss.IndexHNSWFlat(self.dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexFlatIP(self.dimension)
+            index.add(self._matrix)
+            self._faiss_index = index
+        return self._faiss_index
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, **kwargs):
+        """Return (document, cosine similarity) pairs for the k nearest vectors"""
+        query = _normalize(embedding).reshape(1, self.dimension)
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return []
+            k = min(k, count)
+            if self.backend == "faiss":
+                scores, rows = self._get_faiss_index().search(query, k)
+                hits = [(row, score) for row, score in zip(rows[0], scores[0]) if row >= 0]
+            else:
+                scores = self._matrix @ query[0]
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                hits = [(row, scores[row]) for row in top]
+            return [(self._document(row), float(score)) for row, score in hits]
+
+    def _document(self, row):
+        record = self._records[row]
+        metadata = {key: record[key] for key in RECORD_FIELDS}
+        return Document(id=self._ids[row], page_content=record["text"], metadata=metadata)
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    def save(self, directory):
+        """Write vectors and records to a directory"""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            np.save(os.path.join(directory, "vectors.npy"), self._matrix)
+            with open(os.path.join(directory, "records.json"), "w") as f:
+                json.dump({"ids": self._ids, "records": self._records}, f)
+
+    @classmethod
+    def from_arrays(cls, embedding, ids, records, matrix, backend="numpy", index_type=LOCAL_INDEX_TYPE):
+        """Build a store around existing rows of normalized float32 vectors
+
+        `matrix` is used as is, so it can be a copy-on-write memory map whose
+        pages are only read from disk as searches touch them.
+        """
+        store = cls(embedding, matrix.shape[1], backend, index_type)
+        store._matrix = matrix
+        store._ids = list(ids)
+        store._records = list(records)
+        store._positions = {key: row for row, key in enumerate(store._ids)}
+        return store
+
+    @classmethod
+    def load(cls, directory, embedding, backend="numpy", index_type=LOCAL_INDEX_TYPE):
+        """Load a store written by save(); returns None if there is none"""
+        try:
+            matrix = np.load(os.path.join(directory, "vectors.npy"))
+            with open(os.path.join(directory, "records.json")) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls.from_arrays(embedding, data["ids"], data["records"], matrix.astype(np.float32, copy=False),
+                               backend, index_type)
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, **kwargs):
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids)
+        return store
@@ -0,0 +1,132 @@
+import cProfile
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import METRICS_SAMPLES, METRICS_EVENTS
+
+# Process-wide spans and counters. Spans time a stage (e.g. "query.retrieval",
+# "ingest.embed_batch"); counters accumulate totals (cache hits, bytes, tokens).
+# Both are safe to record from any thread.
+
+
+class Metrics:
+    """Thread-safe registry of span timings and counters
+
+    Each span name keeps its count, total and maximum seconds plus the last
+    `samples` durations for quantiles; the last `events` finished spans are
+    kept in order for JSON-lines export.
+    """
+
+    def __init__(self, samples=METRICS_SAMPLES, events=METRICS_EVENTS):
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._counters = {}
+        self._events = deque(maxlen=events)
+
+    def record(self, name, seconds, **labels):
+        """Record one finished span of `seconds`"""
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {"count": 0, "sum": 0.0, "max": 0.0, "recent": deque(maxlen=self._samples)}
+            span["count"] += 1
+            span["sum"] += seconds
+            span["max"] = max(span["max"], seconds)
+            span["recent"].append(seconds)
+            self._events.append({"time": time.time(), "span": name, "seconds": seconds, **labels})
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the enclosed block as one span of `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **labels)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Return {"spans": {name: summary}, "counters": {name: value}}"""
+        with self._lock:
+            spans = {}
+            for name, span in sorted(self._spans.items()):
+                recent = sorted(span["recent"])
+                spans[name] = {
+                    "count": span["count"],
+                    "mean": span["sum"] / span["count"],
+                    "p50": recent[len(recent) // 2],
+                    "p95": recent[int(0.95 * (len(recent) - 1))],
+                    "max": span["max"],
+                    "sum": span["sum"],
+                }
+            return {"spans": spans, "counters": dict(sorted(self._counters.items()))}
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self._events.clear()
+
+    def prometheus_text(self, prefix="course_advisor"):
+        """Render spans as Prometheus summaries and counters as counters"""
+        snapshot = self.snapshot()
+        lines = []
+        if snapshot["spans"]:
+            metric = f"{prefix}_span_seconds"
+            lines += [f"# HELP {metric} Duration of pipeline stages.", f"# TYPE {metric} summary"]
+            for name, span in snapshot["spans"].items():
+                for key, quantile in (("p50", "0.5"), ("p95", "0.95")):
+                    lines.append(f'{metric}{{stage="{name}",quantile="{quantile}"}} {span[key]:.6f}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {span["sum"]:.6f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {span["count"]}')
+        for name, value in snapshot["counters"].items():
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self):
+        """Render the recorded span events, then a snapshot line, as JSON lines"""
+        lines = [json.dumps(event) for event in self.events()]
+        lines.append(json.dumps({"time": time.time(), "snapshot": self.snapshot()}))
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write Prometheus text (for a .prom or .txt path) or JSON lines (anything else)"""
+        text = self.prometheus_text() if path.endswith((".prom", ".txt")) else self.jsonl()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+metrics = Metrics()
+span = metrics.span
+increment = metrics.increment
+
+
+@contextmanager
+def profiled(path):
+    """Profile the enclosed block with cProfile and dump the stats to `path`
+
+    A no-op when path is None. Only the calling thread is profiled; worker
+    threads show up through the spans they record.
+    """
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
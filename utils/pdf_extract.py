@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import fitz  # PyMuPDF for PDFs
+
+# Worker processes are spawned fresh and import this module, so it stays free
+# of module-level imports beyond PyMuPDF; config (which pulls in Streamlit) is
+# only read in the parent.
+
+
+def _extract_page_range(path, start, stop):
+    """Return [(page_number, text)] for pages start..stop-1 of the PDF at path"""
+    with fitz.open(path) as doc:
+        return [(number + 1, doc[number].get_text("text")) for number in range(start, stop)]
+
+
+def page_count(path):
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def iter_pdf_file_pages(path, workers=None, pages_per_task=None):
+    """Yield (page_number, text) for every page of a PDF file, in order
+
+    Page ranges are extracted by worker processes that each open the file
+    themselves, so only page text ever crosses process boundaries. Results
+    are yielded in page order as soon as each range is done.
+    """
+    from config import PDF_WORKERS, PDF_PAGES_PER_TASK
+
+    workers = workers or PDF_WORKERS
+    pages_per_task = pages_per_task or PDF_PAGES_PER_TASK
+    count = page_count(path)
+    ranges = [(start, min(start + pages_per_task, count)) for start in range(0, count, pages_per_task)]
+    if workers <= 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            yield from _extract_page_range(path, start, stop)
+        return
+    # Spawn rather than fork: the app process runs threads that fork would copy mid-flight
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=context) as executor:
+        futures = [executor.submit(_extract_page_range, path, start, stop) for start, stop in ranges]
+        for future in futures:
+            yield from future.result()
+
+
+def spill_to_tempfile(response, chunk_size=1024 * 1024):
+    """Stream a response body to a temporary file and return its path"""
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        for block in response.iter_content(chunk_size):
+            f.write(block)
+    return path
+
+
+def iter_response_pdf_pages(response, workers=None, pages_per_task=None):
+    """Return an iterator of (page_number, text) for a PDF response
+
+    Bodies already on disk (cached responses expose `body_path`) are read in
+    place and retained until the pages are consumed, so the cache cannot
+    evict them meanwhile; anything else is spilled to a temporary file right
+    away, so the response can be closed before the pages are consumed.
+    """
+    path = getattr(response, "body_path", None)
+    if path is None:
+        path = spill_to_tempfile(response)
+        cleanup = lambda: os.remove(path)
+    else:
+        response.retain()
+        cleanup = response.close
+    return _iter_pages_then_cleanup(path, cleanup, workers, pages_per_task)
+
+
+def _iter_pages_then_cleanup(path, cleanup, workers, pages_per_task):
+    try:
+        yield from iter_pdf_file_pages(path, workers, pages_per_task)
+    finally:
+        cleanup()
@@ -0,0 +1,128 @@
+import math
+import re
+from config import (
+    PROMPT_TOKEN_BUDGET,
+    PROMPT_HISTORY_TURNS,
+    PROMPT_HISTORY_SHARE,
+    PROMPT_DUPLICATE_THRESHOLD,
+)
+from data.prompts import get_system_prompt, get_few_shot_examples
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+WORD_RE = re.compile(r"\w+")
+
+
+def count_tokens(text):
+    """Estimate the number of LLM tokens in text
+
+    Words are counted as one token per four characters (at least one) and
+    every punctuation mark as one token, which tracks BPE tokenizers closely
+    enough for budgeting without loading one.
+    """
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in TOKEN_RE.findall(text))
+
+
+def _message_tokens(message):
+    # Chat templates add a few tokens of role header per message
+    return count_tokens(message["content"]) + 4
+
+
+def _word_set(text):
+    return frozenset(word.lower() for word in WORD_RE.findall(text))
+
+
+def context_text(doc):
+    """Return a document's text for the prompt, labelled with its catalog year if it has one"""
+    catalog = doc.metadata.get("catalog")
+    return f"[{catalog} catalog] {doc.page_content}" if catalog else doc.page_content
+
+
+def dedupe_documents(docs, threshold=PROMPT_DUPLICATE_THRESHOLD):
+    """Drop documents whose words overlap an earlier one's by at least `threshold` (Jaccard)"""
+    kept, seen = [], []
+    for doc in docs:
+        words = _word_set(doc.page_content)
+        if any(len(words & other) / (len(words | other) or 1) >= threshold for other in seen):
+            continue
+        kept.append(doc)
+        seen.append(words)
+    return kept
+
+
+class PromptBuilder:
+    """Assemble chat messages for a query within a token budget
+
+    The system prompt and few-shot examples never change, so their messages
+    and token count are built once. Every request starts with that identical
+    prefix, which lets providers cache it. The most recent history turns and
+    the best-ranked context chunks are then added while they fit, and the
+    retrieved context goes into the final user message with the query.
+    """
+
+    def __init__(self, token_budget=PROMPT_TOKEN_BUDGET, history_turns=PROMPT_HISTORY_TURNS,
+                 history_share=PROMPT_HISTORY_SHARE, duplicate_threshold=PROMPT_DUPLICATE_THRESHOLD):
+        self.token_budget = token_budget
+        self.history_turns = history_turns
+        self.history_share = history_share
+        self.duplicate_threshold = duplicate_threshold
+        self.prefix = (
+            {"role": "system", "content": get_system_prompt().strip()},
+            {"role": "user", "content": f"Here are some examples of how you should respond:\n{get_few_shot_examples().strip()}"},
+            {"role": "assistant", "content": "I understand. I'll follow these examples when answering questions about UCONN courses."},
+        )
+        self.prefix_tokens = sum(_message_tokens(message) for message in self.prefix)
+
+    def _fit_history(self, conversation_history, budget):
+        """Return the most recent messages that fit the budget, oldest first"""
+        fitted = []
+        for message in reversed(conversation_history[-self.history_turns:] if self.history_turns else []):
+            cost = _message_tokens(message)
+            if cost > budget:
+                break
+            fitted.append({"role": message["role"], "content": message["content"]})
+            budget -= cost
+        # Keep whole exchanges: the history should not open with an orphaned answer
+        if fitted and fitted[-1]["role"] == "assistant":
+            budget += _message_tokens(fitted.pop())
+        fitted.reverse()
+        return fitted, budget
+
+    def _fit_context(self, docs, budget):
+        """Return the best-ranked distinct documents that fit the budget, in rank order"""
+        fitted = []
+        for doc in dedupe_documents(docs, self.duplicate_threshold):
+            cost = count_tokens(context_text(doc)) + 1
+            if cost <= budget:
+                fitted.append(doc)
+                budget -= cost
+        return fitted
+
+    def prepare(self, query, conversation_history):
+        """Fit the history for a query before its context is known
+
+        Returns a plan for finish(), so history can be prepared while
+        retrieval is still running.
+        """
+        question = f"Question: {query}"
+        remaining = self.token_budget - self.prefix_tokens - _message_tokens({"content": question}) - 16
+        history_budget = max(0, int(remaining * self.history_share))
+        history, history_left = self._fit_history(conversation_history, history_budget)
+        # Context gets everything the history did not use
+        return {"query": query, "question": question, "history": history, "context_budget": remaining - (history_budget - history_left)}
+
+    def finish(self, plan, docs):
+        """Return (messages, context documents used, history messages used) for a prepared plan"""
+        context_docs = self._fit_context(docs, plan["context_budget"])
+        context = "\n".join(context_text(doc) for doc in context_docs)
+        question = plan["question"]
+        content = f"Here is relevant information from the UCONN course catalog:\n{context}\n\n{question}" if context else question
+        messages = [*self.prefix, *plan["history"], {"role": "user", "content": content}]
+        return messages, context_docs, plan["history"]
+
+    def message_tokens(self, messages):
+        """Estimate the prompt tokens of messages returned by finish()"""
+        return self.prefix_tokens + sum(_message_tokens(message) for message in messages[len(self.prefix):])
+
+    def build(self, query, docs, conversation_history):
+        """Return (messages, context documents used, history messages used)"""
+        return self.finish(self.prepare(query, conversation_history), docs)
@@ -1,66 +1,156 @@
-import os
-import streamlit as st
-from groq import Groq
-from utils.document_processor import identify_source_urls
-from data.prompts import get_system_prompt, get_few_shot_examples
+import time
+from config import RETRIEVAL_K
+from utils.answer_cache import context_fingerprint
+from utils.catalogs import find_catalog
+from utils.metrics import increment, metrics, span
+from utils.resources import (
+    get_answer_cache, get_catalogs, get_embeddings, get_groq_client, get_prompt_builder, get_source_index,
+)
+from utils.retriever import get_retriever
+from utils.source_index import source_label
 
-def process_query(query, conversation_history):
+def retrieve_documents(query, vectorstore, k=RETRIEVAL_K):
+    """Retrieve context documents for a query, returning (documents, query_vector)
+
+    Goes through the store's shared retriever (see utils.retriever), which
+    answers course-code questions from the course table and otherwise
+    re-ranks a wider hybrid candidate pool for a diverse top k;
+    query_vector is None whenever embedding was skipped.
+    """
+    return get_retriever(vectorstore).retrieve(query, k)
+
+def process_query(query, conversation_history, vectorstore, client=None):
     """Process user queries with few-shot prompting"""
-    # Retrieve relevant documents
-    relevant_docs = st.session_state.vectorstore.as_retriever(
-        search_type="similarity", 
-        search_kwargs={"k": 5}
-    ).get_relevant_documents(query)
-    
-    context = "\n".join([doc.page_content for doc in relevant_docs])
-    
-    # Build conversation history string
-    conv_history_str = ""
-    for msg in conversation_history[-4:]:  # Limit to last 4 messages for context
-        if msg["role"] == "user":
-            conv_history_str += f"User: {msg['content']}\n"
-        else:
-            conv_history_str += f"Assistant: {msg['content']}\n"
-    
-    # Get system prompt and few-shot examples
-    system_prompt = get_system_prompt()
-    few_shot_examples = get_few_shot_examples()
-    
-    # Craft the prompt in Llama 3 format with few-shot examples
-    prompt = f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n{system_prompt}<|eot_id|>"
+    return "".join(stream_query(query, conversation_history, vectorstore, client))
+
+# Completion parameters shared by the synchronous and async query paths
+COMPLETION_OPTIONS = {
+    "model": "llama-3.3-70b-versatile",
+    "temperature": 0.2,  # Lower temperature for more factual responses
+    "max_tokens": 1024,
+}
+
+def prepare_request(plan, relevant_docs, query_vector):
+    """Finish the prompt for retrieved documents and check the answer cache
+
+    Returns a request dict with the chat messages, the context documents
+    actually sent, the query vector and answer-cache fingerprint keying the
+    response, and any cached response. A question whose retrieval skipped
+    embedding is embedded here, so its answer can be cached as well.
+    """
+    with span("query.prompt"):
+        builder = get_prompt_builder()
+        messages, context_docs, history = builder.finish(plan, relevant_docs)
+        context = "\n".join(doc.page_content for doc in context_docs)
+        conv_history_str = "".join(f"{msg['role']}: {msg['content']}\n" for msg in history)
     
-    # Add few-shot examples in the conversation history
-    prompt += f"<|start_header_id|>user<|end_header_id|>\nHere are some examples of how you should respond:\n{few_shot_examples}<|eot_id|>"
-    prompt += f"<|start_header_id|>assistant<|end_header_id|>\nI understand. I'll follow these examples when answering questions about UCONN courses.<|eot_id|>"
+    # Reuse the answer to a near-identical question asked over the same context
+    with span("query.answer_cache"):
+        fingerprint = context_fingerprint(context, conv_history_str)
+        if query_vector is None:
+            # Course-code questions skip embedding during retrieval; embed them
+            # now, through the embedding cache, so their answers are cached too
+            query_vector = get_embeddings().embed_query(plan["query"])
+        cached_response = get_answer_cache().lookup(query_vector, fingerprint)
+    if cached_response is None:
+        increment("llm.requests")
+        increment("llm.prompt_tokens", builder.message_tokens(messages))
+    return {
+        "messages": messages,
+        "context": context,
+        "context_docs": context_docs,
+        "query_vector": query_vector,
+        "fingerprint": fingerprint,
+        "cached_response": cached_response,
+    }
+
+def identify_source_urls(content, docs=None):
+    """Identify potential source URLs based on content"""
+    # Sources come from the catalog of the best-ranked document
+    namespace = next((doc.metadata["namespace"] for doc in docs or [] if doc.metadata.get("namespace")), None)
+    catalog = find_catalog(get_catalogs(), namespace)
+    source_index = get_source_index(catalog["namespace"])
+    urls = []
+    # Chunk-level sources are exact, so they come first
+    for doc in docs or []:
+        source = doc.metadata.get("source")
+        if source:
+            urls.append((source_index.label_for(doc.page_content, source), source))
+    # Indexes restored from vectors stored without a source may map codes to ""
+    urls.extend((code, url) for code, url in source_index.match(content) if url)
     
-    # Add recent conversation history
-    if conv_history_str:
-        prompt += f"<|start_header_id|>user<|end_header_id|>\nHere's our recent conversation history:\n{conv_history_str}<|eot_id|>"
-        prompt += f"<|start_header_id|>assistant<|end_header_id|>\nThank you for providing the conversation history. I'll keep it in mind for context.<|eot_id|>"
+    # If no specific course codes found, return most relevant URLs
+    if not urls:
+        for url in catalog["pdf_urls"]:
+            label = source_label(url)
+            # "Undergraduate Catalog" or "Graduate Catalog"
+            if label.split()[0].lower() in content.lower():
+                urls.append((label, url))
     
-    # Add context from retrieved documents
-    prompt += f"<|start_header_id|>user<|end_header_id|>\nHere is relevant information from the UCONN course catalog:\n{context}<|eot_id|>"
-    prompt += f"<|start_header_id|>assistant<|end_header_id|>\nThank you for providing the context. I'll use this information to answer accurately.<|eot_id|>"
+    # Return up to 3 unique sources, deduplicated by URL in order of relevance
+    unique = {}
+    for name, url in urls:
+        unique.setdefault(url, (name, url))
+    return list(unique.values())[:3]
+
+def sources_footer(request, response):
+    """Return the source-URL footer for a response, or "" if it already cites URLs"""
+    with span("query.sources"):
+        source_urls = identify_source_urls(request["context"], request["context_docs"])
+    if not source_urls or "https://" in response:
+        return ""
+    footer = "\n\nSources:"
+    for name, url in source_urls:
+        footer += f"\n- {name}: {url}"
+    return footer
+
+def store_response(request, response):
+    """Cache a finished response under the request's query vector and context"""
+    get_answer_cache().store(request["query_vector"], request["fingerprint"], response)
+
+def stream_query(query, conversation_history, vectorstore, client=None):
+    """Process a user query and yield the response as it is generated
+
+    Tokens are yielded as they arrive from Groq, followed by the source-URL
+    footer. A cached answer is yielded in one piece. Nothing here depends on
+    Streamlit, so the same pipeline serves the app, the CLI and benchmarks.
+    """
+    query_start = time.perf_counter()
+    # Retrieve relevant documents; the query vector (None when a course-code
+    # fast path skipped embedding, see prepare_request) also keys the answer cache
+    relevant_docs, query_vector = retrieve_documents(query, vectorstore)
     
-    # Add the actual user query
-    prompt += f"<|start_header_id|>user<|end_header_id|>\n{query}<|eot_id|><|start_header_id|>assistant<|end_header_id|>"
+    # Fit the static prefix, recent history and distinct context chunks into the token budget
+    plan = get_prompt_builder().prepare(query, conversation_history)
+    request = prepare_request(plan, relevant_docs, query_vector)
+    if request["cached_response"] is not None:
+        metrics.record("query.total", time.perf_counter() - query_start)
+        yield request["cached_response"]
+        return
     
-    # Call Groq API
-    client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-    chat_completion = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama-3.3-70b-versatile",
-        temperature=0.2,  # Lower temperature for more factual responses
-        max_tokens=1024,
-    )
+    # Call Groq API through the process-wide client with structured chat
+    # messages, streaming the completion
+    client = client or get_groq_client()
+    start = time.perf_counter()
+    stream = client.chat.completions.create(messages=request["messages"], stream=True, **COMPLETION_OPTIONS)
     
-    response = chat_completion.choices[0].message.content
+    parts = []
+    for chunk in stream:
+        token = chunk.choices[0].delta.content
+        if token:
+            if not parts:
+                metrics.record("query.first_token", time.perf_counter() - start)
+            parts.append(token)
+            yield token
+    metrics.record("query.completion", time.perf_counter() - start)
+    increment("llm.completion_chunks", len(parts))
+    response = "".join(parts)
     
     # Identify potential source URLs and add to response if not already included
-    source_urls = identify_source_urls(context)
-    if source_urls and "https://" not in response:
-        response += "\n\nSources:"
-        for name, url in source_urls:
-            response += f"\n- {name}: {url}"
+    footer = sources_footer(request, response)
+    if footer:
+        response += footer
+        yield footer
     
-    return response
\ No newline at end of file
+    store_response(request, response)
+    metrics.record("query.total", time.perf_counter() - query_start)
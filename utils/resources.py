@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+from config import EMBEDDING_MODEL, EMBEDDING_BACKEND, PINECONE_NAMESPACE, PINECONE_POOL_THREADS, RESOURCE_HEALTH_CHECK_INTERVAL
+from utils.answer_cache import SemanticAnswerCache
+from utils.catalogs import load_catalogs
+from utils.course_table import CourseTable, course_table_path
+from utils.lexical_index import LexicalIndex, lexical_index_path
+from utils.prompt_builder import PromptBuilder
+from utils.source_index import SourceIndex, source_index_path
+
+
+class SharedResource:
+    """A lazily created client shared by every session in the process
+
+    The factory runs once, on first use, under a lock so concurrent sessions
+    never build duplicates. If a health check is given it runs at most once
+    per `check_interval` seconds, and a failing check rebuilds the client;
+    holders of the old client should call get() again rather than keep it.
+    A factory returning None is not cached, so the next caller retries.
+    """
+
+    def __init__(self, factory, health_check=None, check_interval=RESOURCE_HEALTH_CHECK_INTERVAL):
+        self._factory = factory
+        self._health_check = health_check
+        self._check_interval = check_interval
+        self._value = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _healthy(self, value):
+        try:
+            self._health_check(value)
+        except Exception:
+            return False
+        return True
+
+    def get(self):
+        """Return the shared client, creating or reconnecting it if needed
+
+        The health check runs outside the lock, so a slow check never blocks
+        other callers; they keep getting the current client meanwhile.
+        """
+        with self._lock:
+            value = self._value
+            if value is not None:
+                if self._health_check is None or time.monotonic() - self._checked_at < self._check_interval:
+                    return value
+                # This caller runs the check; until it is due again, others skip it
+                self._checked_at = time.monotonic()
+        if value is not None and self._healthy(value):
+            return value
+        with self._lock:
+            if self._value is value:
+                self._value = self._factory()
+                self._checked_at = time.monotonic()
+            return self._value
+
+    def reset(self):
+        """Drop the client so the next get() rebuilds it"""
+        with self._lock:
+            self._value = None
+
+    def set(self, value):
+        """Use the given client instead of building one"""
+        with self._lock:
+            self._value = value
+            self._checked_at = time.monotonic()
+
+
+class NamespacedResource:
+    """One SharedResource per vector store namespace, each created on first use
+
+    The factory takes the namespace. get(), set() and reset() act on the
+    default namespace unless another is named; reset_all() drops every one.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def _resource(self, namespace):
+        with self._lock:
+            resource = self._resources.get(namespace)
+            if resource is None:
+                resource = self._resources[namespace] = SharedResource(lambda: self._factory(namespace))
+            return resource
+
+    def get(self, namespace=PINECONE_NAMESPACE):
+        return self._resource(namespace).get()
+
+    def set(self, value, namespace=PINECONE_NAMESPACE):
+        self._resource(namespace).set(value)
+
+    def reset(self, namespace=PINECONE_NAMESPACE):
+        self._resource(namespace).reset()
+
+    def reset_all(self):
+        with self._lock:
+            resources = list(self._resources.values())
+        for resource in resources:
+            resource.reset()
+
+
+def _create_embeddings():
+    """Create the embeddings client, cached on disk so rebuilds and repeated
+    queries skip the embedding API"""
+    from utils.embedding_cache import CachedEmbeddings
+    from utils.fakes import FakeEmbeddings
+
+    if EMBEDDING_BACKEND == "fake":
+        return CachedEmbeddings(FakeEmbeddings(), "fake")
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return CachedEmbeddings(GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL)
+
+
+def _create_pinecone_client():
+    from pinecone import Pinecone
+
+    return Pinecone(api_key=os.environ.get("PINECONE_API_KEY"), pool_threads=PINECONE_POOL_THREADS)
+
+
+def _create_groq_client():
+    from groq import Groq
+
+    return Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+
+# Client SDKs are imported by the factories, on first use, so importing this
+# module (and rendering the app) does not pay for them up front
+_pinecone_client = SharedResource(_create_pinecone_client)
+_embeddings = SharedResource(_create_embeddings)
+_groq_client = SharedResource(_create_groq_client)
+_answer_cache = SharedResource(SemanticAnswerCache)
+_source_index = NamespacedResource(lambda namespace: SourceIndex.load(source_index_path(namespace)))
+_lexical_index = NamespacedResource(lambda namespace: LexicalIndex.load(lexical_index_path(namespace)))
+_course_table = NamespacedResource(lambda namespace: CourseTable(course_table_path(namespace)))
+_prompt_builder = SharedResource(PromptBuilder)
+_catalogs = SharedResource(load_catalogs)
+
+
+def get_pinecone_client():
+    """Return the process-wide Pinecone client"""
+    return _pinecone_client.get()
+
+
+def get_embeddings():
+    """Return the process-wide embeddings client"""
+    return _embeddings.get()
+
+
+def get_groq_client():
+    """Return the process-wide Groq client"""
+    return _groq_client.get()
+
+
+def get_answer_cache():
+    """Return the process-wide semantic answer cache"""
+    return _answer_cache.get()
+
+
+def get_source_index(namespace=PINECONE_NAMESPACE):
+    """Return the process-wide source attribution index of a namespace"""
+    return _source_index.get(namespace)
+
+
+def get_lexical_index(namespace=PINECONE_NAMESPACE):
+    """Return the process-wide BM25 lexical index of a namespace"""
+    return _lexical_index.get(namespace)
+
+
+def get_course_table(namespace=PINECONE_NAMESPACE):
+    """Return the process-wide structured course table of a namespace"""
+    return _course_table.get(namespace)
+
+
+def get_prompt_builder():
+    """Return the process-wide prompt builder with its precomputed static prefix"""
+    return _prompt_builder.get()
+
+
+def get_catalogs():
+    """Return the catalogs declared in the catalog manifest"""
+    return _catalogs.get()
+
+
+def override_resources(**values):
+    """Replace shared clients by name, e.g. override_resources(groq_client=FakeGroq())
+
+    For headless runs, benchmarks and evaluations that should not touch the
+    real services or the on-disk caches. Names match the get_* functions;
+    per-namespace indexes are replaced for the default namespace.
+    """
+    resources = {
+        "pinecone_client": _pinecone_client,
+        "embeddings": _embeddings,
+        "groq_client": _groq_client,
+        "answer_cache": _answer_cache,
+        "source_index": _source_index,
+        "lexical_index": _lexical_index,
+        "course_table": _course_table,
+        "prompt_builder": _prompt_builder,
+        "catalogs": _catalogs,
+    }
+    for name, value in values.items():
+        resources[name].set(value)
+
+
+def reload_indexes():
+    """Reload the source and lexical indexes from disk after an ingest rewrote them"""
+    _source_index.reset_all()
+    _lexical_index.reset_all()
@@ -0,0 +1,225 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config import (
+    RETRIEVAL_K,
+    RETRIEVAL_FETCH_K,
+    HYBRID_RETRIEVAL,
+    COURSE_LOOKUP,
+    MMR_LAMBDA,
+    RERANK_BUDGET,
+    PINECONE_NAMESPACE,
+)
+from utils.catalogs import CatalogStores, route_catalogs
+from utils.index_sync import content_hash
+from utils.lexical_index import code_tokens, hybrid_search, reciprocal_rank_fusion
+from utils.metrics import increment, span
+from utils.resources import get_course_table, get_lexical_index
+
+
+def dedupe_by_hash(docs):
+    """Drop documents whose exact text appeared earlier in the list"""
+    seen = set()
+    kept = []
+    for doc in docs:
+        digest = content_hash(doc.page_content)
+        if digest not in seen:
+            seen.add(digest)
+            kept.append(doc)
+    return kept
+
+
+def mmr(relevance, vectors, k, mmr_lambda=MMR_LAMBDA):
+    """Return the row order of maximal marginal relevance for k picks
+
+    `relevance` holds each candidate's relevance and `vectors` its normalized
+    embedding. Each pick maximizes lambda * relevance - (1 - lambda) *
+    (highest similarity to an earlier pick), computed for all candidates at
+    once from one similarity matrix.
+    """
+    count = len(relevance)
+    similarity = vectors @ vectors.T
+    redundancy = np.full(count, -np.inf)
+    available = np.ones(count, dtype=bool)
+    picks = []
+    for _ in range(min(k, count)):
+        penalty = np.where(np.isinf(redundancy), 0.0, redundancy)
+        scores = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * penalty, -np.inf)
+        pick = int(np.argmax(scores))
+        picks.append(pick)
+        available[pick] = False
+        redundancy = np.maximum(redundancy, similarity[pick])
+    return picks
+
+
+class Retriever:
+    """Retrieval stage built once per vector store
+
+    Fetches `fetch_k` candidates (fused BM25 + vector results, or course-table
+    records for course-code questions), drops exact duplicates by content
+    hash and re-ranks the rest with MMR to return a diverse top k. Candidate
+    vectors come from the store itself when it keeps them (vectors_for) or
+    from the embedding cache, so re-ranking makes no API calls. Lookups run
+    in batches of `lookup_batch` and once `budget` seconds have passed no
+    further batch starts; the fused order is then used as is. The lexical
+    index and course table are those of `namespace`.
+    """
+
+    lookup_batch = 16
+
+    def __init__(self, vectorstore, k=RETRIEVAL_K, fetch_k=RETRIEVAL_FETCH_K,
+                 mmr_lambda=MMR_LAMBDA, budget=RERANK_BUDGET, namespace=PINECONE_NAMESPACE):
+        self.vectorstore = vectorstore
+        self.namespace = namespace
+        self.k = k
+        self.fetch_k = max(fetch_k, k)
+        self.mmr_lambda = mmr_lambda
+        self.budget = budget
+        embeddings = getattr(vectorstore, "embeddings", None)
+        self._store_vectors = getattr(vectorstore, "vectors_for", None)
+        self._cached_vectors = getattr(embeddings, "cached_documents", None)
+
+    def retrieve(self, query, k=None):
+        """Return (documents, query_vector); query_vector is None when embedding was skipped"""
+        with span("query.retrieval"):
+            return self.search(query, k)
+
+    def search(self, query, k=None, query_vector=None):
+        """retrieve() without its span, reusing query_vector if one is given"""
+        k = k or self.k
+        docs, query_vector = self._candidates(query, k, query_vector)
+        docs = dedupe_by_hash(docs)
+        if len(docs) > k:
+            docs = self._rerank(docs, query_vector, k)
+        return docs[:k], query_vector
+
+    def _candidates(self, query, k, query_vector=None):
+        lexical_index = get_lexical_index(self.namespace) if HYBRID_RETRIEVAL else None
+        codes = code_tokens(query)
+        if COURSE_LOOKUP and codes:
+            # Courses named in the query come straight from the course table,
+            # topped up from the lexical index, skipping vector search
+            with span("query.course_lookup"):
+                course_docs = get_course_table(self.namespace).documents(codes)[:k]
+            if course_docs:
+                extra = []
+                if lexical_index is not None and len(course_docs) < k:
+                    extra = [doc for doc, _ in lexical_index.search(query, self.fetch_k, terms=codes)]
+                return course_docs + extra, None
+        return hybrid_search(query, self.vectorstore, lexical_index, k=self.fetch_k, query_vector=query_vector)
+
+    def _vectors(self, docs, deadline):
+        """Return a normalized vector (or None) for each document, or None if
+        the deadline passed before every lookup batch could start"""
+        vectors = [None] * len(docs)
+        if self._store_vectors is not None:
+            ids = [doc.id for doc in docs if doc.id]
+            for start in range(0, len(ids), self.lookup_batch):
+                if time.perf_counter() > deadline:
+                    return None
+                chunks, matrix = self._store_vectors(ids[start:start + self.lookup_batch])
+                rows = {chunk["id"]: matrix[row] for row, chunk in enumerate(chunks)}
+                for i, doc in enumerate(docs):
+                    if doc.id in rows:
+                        vectors[i] = rows[doc.id]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if self._cached_vectors is not None:
+            for start in range(0, len(missing), self.lookup_batch):
+                if time.perf_counter() > deadline:
+                    return None
+                batch = missing[start:start + self.lookup_batch]
+                for i, vector in zip(batch, self._cached_vectors([docs[i].page_content for i in batch])):
+                    if vector is not None:
+                        vector = np.asarray(vector, dtype=np.float32)
+                        vectors[i] = vector / (np.linalg.norm(vector) or 1.0)
+        return vectors
+
+    def _rerank(self, docs, query_vector, k):
+        if self.mmr_lambda >= 1.0:
+            return docs
+        deadline = time.perf_counter() + self.budget
+        with span("query.rerank"):
+            vectors = self._vectors(docs, deadline)
+            if vectors is None or time.perf_counter() > deadline:
+                increment("retrieval.rerank_skipped")
+                return docs
+            # Relevance follows the fused rank, averaged with query similarity
+            # where both vectors are known. Candidates without a vector get a
+            # zero vector: they keep their rank relevance and never count as
+            # redundant, so e.g. course-table records stay on top.
+            relevance = 1.0 - np.arange(len(docs), dtype=np.float32) / len(docs)
+            matrix = np.zeros((len(docs), self._dimension(vectors)), dtype=np.float32)
+            known = np.array([vector is not None for vector in vectors])
+            for i, vector in enumerate(vectors):
+                if vector is not None:
+                    matrix[i] = vector
+            if query_vector is not None and known.any():
+                query = np.asarray(query_vector, dtype=np.float32)
+                similarity = matrix @ (query / (np.linalg.norm(query) or 1.0))
+                relevance = np.where(known, (relevance + similarity) / 2, relevance)
+            return [docs[i] for i in mmr(relevance, matrix, k, self.mmr_lambda)]
+
+    @staticmethod
+    def _dimension(vectors):
+        return next((len(vector) for vector in vectors if vector is not None), 1)
+
+
+class CatalogRetriever:
+    """Retrieval across catalog years (see utils.catalogs.CatalogStores)
+
+    Each query goes to the catalogs route_catalogs() picks for it. When more
+    than one answers, they are searched concurrently with a single query
+    embedding and their results merged by reciprocal rank. Documents are
+    tagged with their catalog name and namespace.
+    """
+
+    def __init__(self, catalog_stores, k=RETRIEVAL_K):
+        self.catalog_stores = catalog_stores
+        self.k = k
+        self._retrievers = {
+            catalog["name"]: Retriever(catalog_stores.stores[catalog["name"]], k, namespace=catalog["namespace"])
+            for catalog in catalog_stores.catalogs
+        }
+        self._executor = ThreadPoolExecutor(max_workers=len(self._retrievers), thread_name_prefix="catalog-retrieval")
+
+    def retrieve(self, query, k=None):
+        """Return (documents, query_vector); query_vector is None when embedding was skipped"""
+        k = k or self.k
+        with span("query.retrieval"):
+            catalogs = route_catalogs(query, self.catalog_stores.catalogs)
+            if len(catalogs) == 1:
+                return self._search(catalogs[0], query, k, None)
+            increment("retrieval.catalog_fanout")
+            query_vector = None
+            if not code_tokens(query):
+                # Embed once for every catalog rather than once per catalog
+                with span("query.embed"):
+                    query_vector = self.catalog_stores.embeddings.embed_query(query)
+            results = list(self._executor.map(lambda catalog: self._search(catalog, query, k, query_vector), catalogs))
+            query_vector = query_vector if query_vector is not None else next(
+                (vector for _, vector in results if vector is not None), None)
+            return reciprocal_rank_fusion([docs for docs, _ in results], k), query_vector
+
+    def _search(self, catalog, query, k, query_vector):
+        docs, query_vector = self._retrievers[catalog["name"]].search(query, k, query_vector)
+        for doc in docs:
+            doc.metadata = {**doc.metadata, "catalog": catalog["name"], "namespace": catalog["namespace"]}
+        return docs, query_vector
+
+
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(vectorstore):
+    """Return the retriever for a vector store (or CatalogStores), building it on first use
+
+    The retriever is kept on the store itself, so it lives exactly as long
+    as the store does.
+    """
+    with _retrievers_lock:
+        retriever = getattr(vectorstore, "_shared_retriever", None)
+        if retriever is None:
+            factory = CatalogRetriever if isinstance(vectorstore, CatalogStores) else Retriever
+            retriever = vectorstore._shared_retriever = factory(vectorstore)
+        return retriever
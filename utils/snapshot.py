@@ -0,0 +1,171 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from config import SNAPSHOT_DIR, EMBEDDING_MODEL, EMBEDDING_BACKEND
+from utils.local_store import RECORD_FIELDS, LocalVectorStore
+from utils.source_index import SourceIndex
+
+# A snapshot is a directory named after its content version:
+#   manifest.json      format, embedding model, dimension, count and file checksums
+#   chunks.jsonl.gz    one chunk record per vector row (id, text and metadata)
+#   vectors.f32        raw row-major float32 vectors, memory-mapped on load
+#   sources.json       course code -> source URLs (SourceIndex)
+#   courses.jsonl.gz   structured course records (CourseTable)
+# Snapshots are kept per catalog namespace, in SNAPSHOT_DIR/<namespace>/, where
+# LATEST names the most recent one. The manifest records the catalog and
+# namespace too, and a snapshot is only ever loaded into that catalog.
+SNAPSHOT_FORMAT = 1
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_jsonl_gz(records, path):
+    # mtime=0 keeps the compressed bytes identical for identical content
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        for record in records:
+            f.write((json.dumps(record, sort_keys=True) + "\n").encode("utf-8"))
+
+
+def _read_jsonl_gz(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def embedding_model_name():
+    return "fake" if EMBEDDING_BACKEND == "fake" else EMBEDDING_MODEL
+
+
+def write_snapshot(store, source_index, course_records, catalog, directory=SNAPSHOT_DIR, model=None):
+    """Write a snapshot of a catalog's local store and indexes, returning its path
+
+    Rows are written in chunk-ID order and the version is a hash of the
+    content, so the same index always produces the same snapshot. Files are
+    written to a temporary directory and moved into place at the end.
+    """
+    model = model or embedding_model_name()
+    directory = os.path.join(directory, catalog["namespace"])
+    ids = sorted(store.ids)
+    chunks, matrix = store.vectors_for(ids)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    course_records = sorted(course_records, key=lambda record: record["code"])
+
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{model}:{catalog['name']}:{matrix.shape}".encode("utf-8"))
+    for chunk in chunks:
+        digest.update(f"{chunk['id']}:{chunk['hash']}\n".encode("utf-8"))
+    digest.update(json.dumps(source_index.sources, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(course_records, sort_keys=True).encode("utf-8"))
+    version = digest.hexdigest()[:16]
+
+    path = os.path.join(directory, version)
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        _write_jsonl_gz(chunks, os.path.join(tmp_path, "chunks.jsonl.gz"))
+        matrix.tofile(os.path.join(tmp_path, "vectors.f32"))
+        with open(os.path.join(tmp_path, "sources.json"), "w") as f:
+            json.dump(source_index.sources, f, sort_keys=True)
+        _write_jsonl_gz(course_records, os.path.join(tmp_path, "courses.jsonl.gz"))
+        files = {name: _sha256(os.path.join(tmp_path, name)) for name in sorted(os.listdir(tmp_path))}
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "catalog": catalog["name"],
+            "namespace": catalog["namespace"],
+            "embedding_model": model,
+            "dimension": int(matrix.shape[1]),
+            "count": len(chunks),
+            "courses": len(course_records),
+            "files": files,
+        }
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    latest_tmp = os.path.join(directory, "LATEST.tmp")
+    with open(latest_tmp, "w") as f:
+        f.write(version)
+    os.replace(latest_tmp, os.path.join(directory, "LATEST"))
+    return path
+
+
+def latest_snapshot(namespace, directory=SNAPSHOT_DIR):
+    """Return the path of a namespace's most recent snapshot, or None if there is none"""
+    directory = os.path.join(directory, namespace)
+    try:
+        with open(os.path.join(directory, "LATEST")) as f:
+            path = os.path.join(directory, f.read().strip())
+    except OSError:
+        return None
+    return path if os.path.exists(os.path.join(path, "manifest.json")) else None
+
+
+def read_snapshot(path, verify=False):
+    """Open a snapshot, returning a dict of its manifest and contents
+
+    "vectors" is a copy-on-write memory map of the float32 rows, so opening
+    a snapshot reads only the chunk records. With `verify`, every file is
+    checked against the manifest checksums first. Raises ValueError for an
+    incompatible or damaged snapshot.
+    """
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')}")
+    if verify:
+        for name, checksum in manifest["files"].items():
+            if _sha256(os.path.join(path, name)) != checksum:
+                raise ValueError(f"Snapshot file {name} does not match its checksum")
+    vectors_path = os.path.join(path, "vectors.f32")
+    shape = (manifest["count"], manifest["dimension"])
+    if os.path.getsize(vectors_path) != shape[0] * shape[1] * 4:
+        raise ValueError("Snapshot vectors do not match the manifest")
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="c", shape=shape) if shape[0] else np.zeros(shape, np.float32)
+    with open(os.path.join(path, "sources.json")) as f:
+        sources = json.load(f)
+    return {
+        "manifest": manifest,
+        "chunks": _read_jsonl_gz(os.path.join(path, "chunks.jsonl.gz")),
+        "vectors": vectors,
+        "source_index": SourceIndex(sources),
+        "courses": _read_jsonl_gz(os.path.join(path, "courses.jsonl.gz")),
+    }
+
+
+def check_compatible(snapshot, catalog, model=None):
+    """Raise ValueError unless the snapshot was taken of `catalog` and embedded
+    with the configured model"""
+    manifest = snapshot["manifest"]
+    model = model or embedding_model_name()
+    if (manifest.get("catalog"), manifest.get("namespace")) != (catalog["name"], catalog["namespace"]):
+        raise ValueError(
+            f"Snapshot is of catalog {manifest.get('catalog')!r} (namespace {manifest.get('namespace')!r}), "
+            f"not {catalog['name']!r} (namespace {catalog['namespace']!r})"
+        )
+    if manifest["embedding_model"] != model:
+        raise ValueError(f"Snapshot was embedded with {manifest['embedding_model']}, not {model}")
+
+
+def snapshot_store(snapshot, embeddings, backend="numpy"):
+    """Return a LocalVectorStore over a snapshot's memory-mapped vectors"""
+    chunks = snapshot["chunks"]
+    records = [{"text": chunk["text"], **{key: chunk.get(key) for key in RECORD_FIELDS}} for chunk in chunks]
+    return LocalVectorStore.from_arrays(embeddings, [chunk["id"] for chunk in chunks], records,
+                                        snapshot["vectors"], backend)
+
+
+def snapshot_manifest(snapshot):
+    """Return the index-sync manifest describing a snapshot's chunks"""
+    return {chunk["id"]: {"source": chunk["source"], "hash": chunk["hash"]} for chunk in snapshot["chunks"]}
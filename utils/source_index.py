@@ -0,0 +1,96 @@
+import json
+import os
+import re
+from urllib.parse import urlparse
+from config import VECTOR_BACKEND, INDEX_MANIFEST_DIR, PINECONE_NAMESPACE
+from utils.catalogs import local_index_dir
+
+# Course codes such as "CSE 3500" or "MATH 2210Q"
+COURSE_CODE_RE = re.compile(r'\b[A-Z]{2,4}\s\d{4}[A-Z]?\b')
+
+
+def source_index_path(namespace=PINECONE_NAMESPACE):
+    """Return where the source index is persisted, next to the vectors it describes"""
+    if VECTOR_BACKEND != "pinecone":
+        return os.path.join(local_index_dir(namespace), "sources.json")
+    return os.path.join(INDEX_MANIFEST_DIR, f"{namespace}.sources.json")
+
+
+def source_label(url):
+    """Return a readable name for a source URL without a course code"""
+    path = urlparse(url).path.rstrip("/")
+    if path.lower().endswith(".pdf"):
+        if "graduate" in path.lower() and "undergraduate" not in path.lower():
+            return "Graduate Catalog"
+        return "Undergraduate Catalog"
+    return f"{path.rsplit('/', 1)[-1].upper()} courses"
+
+
+def _source_rank(url):
+    # Course pages describe one subject, so they attribute a code better than a whole catalog PDF
+    return urlparse(url).path.lower().endswith(".pdf"), url
+
+
+class SourceIndex:
+    """Map from course codes to the URLs that mention them
+
+    Every URL a code appeared in is kept instead of the last one overwriting
+    the rest, course pages before PDFs and otherwise sorted by URL, so the
+    order does not depend on which download finished first. Matching a
+    context is a single pass of the compiled course-code pattern with a
+    dictionary lookup per match, so it costs O(context length) regardless of
+    how many codes are indexed.
+    """
+
+    def __init__(self, sources=None):
+        self.sources = sources or {}
+
+    def __len__(self):
+        return len(self.sources)
+
+    def add_text(self, text, url):
+        """Record every course code in text as appearing at url"""
+        for code in COURSE_CODE_RE.findall(text):
+            urls = self.sources.setdefault(code, [])
+            if url not in urls:
+                urls.append(url)
+                urls.sort(key=_source_rank)
+
+    def lookup(self, code):
+        """Return the URLs for a code, falling back to the code without a suffix letter"""
+        urls = self.sources.get(code)
+        if urls is None and code[-1].isalpha():
+            urls = self.sources.get(code[:-1])
+        return urls or []
+
+    def match(self, content):
+        """Return (code, url) pairs for the codes in content, in order of appearance"""
+        pairs = []
+        for code in dict.fromkeys(COURSE_CODE_RE.findall(content)):
+            urls = self.lookup(code)
+            if urls:
+                pairs.append((code, urls[0]))
+        return pairs
+
+    def label_for(self, text, url):
+        """Name a chunk's source by the first indexed course code it mentions at url"""
+        for code in COURSE_CODE_RE.findall(text):
+            if url in self.lookup(code):
+                return code
+        return source_label(url)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.sources, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or an empty one if there is none"""
+        try:
+            with open(path) as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
@@ -1,22 +1,343 @@
+import functools
 import os
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
 import streamlit as st
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone, ServerlessSpec
-from config import PINECONE_INDEX_NAME, PINECONE_NAMESPACE, EMBEDDING_DIMENSION
-from utils.document_processor import process_documents
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from config import (
+    PINECONE_INDEX_NAME,
+    PINECONE_NAMESPACE,
+    EMBEDDING_DIMENSION,
+    INDEX_SYNC_MODE,
+    VECTOR_BACKEND,
+    PINECONE_POOL_THREADS,
+    INGEST_PROFILE_PATH,
+    WARM_START,
+    SNAPSHOT_DIR,
+    CATALOG_INGEST_WORKERS,
+)
+from utils.catalogs import CatalogStores, default_catalog, local_index_dir
+from utils.course_table import course_table_path, parse_course_block
+from utils.index_sync import content_hash, manifest_path, save_manifest, sync_chunks, sync_interrupted
+from utils.local_store import LocalVectorStore
+from utils.lexical_index import LexicalIndex, lexical_index_path
+from utils.metrics import profiled, span
+from utils.resources import (
+    SharedResource, get_catalogs, get_course_table, get_embeddings, get_pinecone_client, reload_indexes,
+)
+from utils.snapshot import (
+    check_compatible, latest_snapshot, read_snapshot, snapshot_manifest, snapshot_store, write_snapshot,
+)
+from utils.source_index import SourceIndex, source_index_path
+
+class PineconeIndexWriter:
+    """Upsert/delete adapter over a Pinecone index namespace for index sync"""
+
+    def __init__(self, index, namespace, batch_size=100):
+        self.index = index
+        self.namespace = namespace
+        self.batch_size = batch_size
+
+    def upsert(self, chunks, vectors):
+        # Store the text under "text" so PineconeVectorStore can read it back
+        items = [
+            (chunk["id"], vector, {
+                "text": chunk["text"],
+                "source": chunk["source"],
+                "page": chunk["page"],
+                "position": chunk["position"],
+            })
+            for chunk, vector in zip(chunks, vectors)
+        ]
+        for i in range(0, len(items), self.batch_size):
+            self.index.upsert(vectors=items[i:i + self.batch_size], namespace=self.namespace)
+
+    def bulk_upsert(self, chunks, vectors):
+        """Upsert many vectors with batches in flight concurrently on the index's thread pool"""
+        pending = []
+        for i in range(0, len(chunks), self.batch_size):
+            items = [
+                (chunk["id"], np.asarray(vector).tolist(), {
+                    "text": chunk["text"],
+                    "source": chunk["source"],
+                    "page": chunk["page"],
+                    "position": chunk["position"],
+                })
+                for chunk, vector in zip(chunks[i:i + self.batch_size], vectors[i:i + self.batch_size])
+            ]
+            pending.append(self.index.upsert(vectors=items, namespace=self.namespace, async_req=True))
+        for result in pending:
+            result.get()
+
+    def delete(self, ids):
+        # Pinecone accepts at most 1000 IDs per delete request
+        for i in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[i:i + 1000], namespace=self.namespace)
+
+def _pinecone_batches(index, namespace):
+    """Yield (chunk records, vectors) for every vector in a Pinecone namespace, a listed page at a time"""
+    for ids in index.list(namespace=namespace):
+        response = index.fetch(ids=list(ids), namespace=namespace)
+        chunks, vectors = [], []
+        for vector_id, vector in response.vectors.items():
+            metadata = vector.metadata or {}
+            text = metadata.get("text", "")
+            chunks.append({
+                "id": vector_id,
+                "text": text,
+                "source": metadata.get("source", ""),
+                "page": int(metadata.get("page", 1)),
+                "position": int(metadata.get("position", 0)),
+                "hash": content_hash(text),
+            })
+            vectors.append(vector.values)
+        yield chunks, vectors
+
+def export_pinecone_namespace(index, namespace, store):
+    """Copy every vector in a Pinecone namespace into a local store"""
+    count = 0
+    for chunks, vectors in _pinecone_batches(index, namespace):
+        store.upsert(chunks, vectors)
+        count += len(chunks)
+    return count
+
+def pinecone_chunks(index, namespace):
+    """Yield the chunk record of every vector in a Pinecone namespace"""
+    for chunks, _ in _pinecone_batches(index, namespace):
+        yield from chunks
+
+def rebuild_sync_manifest(index, namespace, path):
+    """Recreate a lost index-sync manifest from the vectors in a Pinecone namespace
+
+    Chunk IDs are derived from source, position and content, so vectors with
+    source and text metadata are recorded as indexed and the next sync only
+    embeds what changed. Vectors without them were indexed before manifests
+    existed, under random IDs; they are recorded without a source, so the
+    sync deletes them as stale once the new vectors are in. Returns the
+    number of such vectors.
+    """
+    manifest = {}
+    unusable = 0
+    for chunk in pinecone_chunks(index, namespace):
+        if chunk["source"] and chunk["text"]:
+            manifest[chunk["id"]] = {"source": chunk["source"], "hash": chunk["hash"]}
+        else:
+            manifest[chunk["id"]] = {"source": None, "hash": None}
+            unusable += 1
+    save_manifest(manifest, path)
+    return unusable
+
+def import_into_pinecone(store, index, namespace):
+    """Upsert every vector of a local store into a Pinecone namespace"""
+    chunks, vectors = store.vectors_for(store.ids)
+    PineconeIndexWriter(index, namespace).upsert(chunks, vectors.tolist())
+    return len(chunks)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class _ConsoleStatus:
+    """Status stand-in for headless runs (e.g. cli.py) that prints progress to stderr"""
+
+    def __init__(self, label):
+        print(label, file=sys.stderr)
+
+    def write(self, *args, **kwargs):
+        print(*args, file=sys.stderr)
+
+    def update(self, label=None, **kwargs):
+        if label:
+            print(label, file=sys.stderr)
+
+def _status_container(label):
+    """Return an expanded st.status container, or a console status outside a Streamlit script"""
+    if get_script_run_ctx() is None:
+        return _ConsoleStatus(label)
+    return st.status(label, expanded=True)
+
+class _RelayedStatus:
+    """Stands in for a Streamlit status container on an ingest thread
+
+    Streamlit elements can only be updated from the script thread, so calls
+    are queued and applied there by _run_relayed().
+    """
+
+    def __init__(self, calls, status):
+        self._calls = calls
+        self._status = status
+
+    def write(self, *args, **kwargs):
+        self._calls.put((self._status.write, args, kwargs))
+
+    def update(self, **kwargs):
+        self._calls.put((self._status.update, (), kwargs))
+
+def _apply_calls(calls):
+    while True:
+        try:
+            method, args, kwargs = calls.get_nowait()
+        except queue.Empty:
+            return
+        method(*args, **kwargs)
+
+def _run_relayed(jobs, max_workers):
+    """Run (function, status) jobs on worker threads, returning their results in order
+
+    Each function gets a relayed status; its calls are applied to the real
+    status container on this thread while the jobs run.
+    """
+    calls = queue.Queue()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="catalog-ingest") as executor:
+        futures = [executor.submit(function, _RelayedStatus(calls, status)) for function, status in jobs]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=0.1)
+            _apply_calls(calls)
+    _apply_calls(calls)
+    return [future.result() for future in futures]
+
+def load_latest_snapshot(catalog, status):
+    """Open the latest snapshot of a catalog made with the configured embedding model, or None"""
+    path = latest_snapshot(catalog["namespace"]) if WARM_START else None
+    if path is None:
+        return None
+    try:
+        snapshot = read_snapshot(path)
+        check_compatible(snapshot, catalog)
+    except (OSError, ValueError) as e:
+        status.write(f"Ignoring snapshot {path}: {e}")
+        return None
+    return snapshot
+
+def install_snapshot_indexes(snapshot, sync_manifest_path=None, namespace=PINECONE_NAMESPACE):
+    """Install a snapshot's source, lexical and course indexes (and index-sync manifest)"""
+    snapshot["source_index"].save(source_index_path(namespace))
+    lexical_index = LexicalIndex()
+    for chunk in snapshot["chunks"]:
+        lexical_index.add(chunk)
+    lexical_index.save(lexical_index_path(namespace))
+    get_course_table(namespace).rebuild(snapshot["courses"])
+    if sync_manifest_path:
+        save_manifest(snapshot_manifest(snapshot), sync_manifest_path)
+    reload_indexes()
+
+def warm_start_local(snapshot, embeddings, status, backend="numpy", sync_manifest_path=None,
+                     namespace=PINECONE_NAMESPACE):
+    """Serve a snapshot from memory-mapped vectors, without crawling or embedding"""
+    store = snapshot_store(snapshot, embeddings, backend)
+    install_snapshot_indexes(snapshot, sync_manifest_path, namespace)
+    status.write(f"Warm-started {len(store)} vectors from snapshot {snapshot['manifest']['version']}.")
+    return store
+
+def restore_side_indexes(load_chunks, namespace, status):
+    """Rebuild a namespace's lexical index, source index and course table from
+    its stored chunks if any of them is missing
+
+    A namespace served as it is (INDEX_SYNC_MODE="load") may have been synced
+    elsewhere or before these indexes existed; without them hybrid retrieval,
+    source attribution and course lookups find nothing. Course records are
+    parsed back from the whole-course chunks (page 0, see format_course), so
+    courses that only appear in the PDF catalogs are not restored.
+    `load_chunks()` returns the stored chunk records and is only called when
+    something needs rebuilding. A marker file records that the course table
+    was restored, so a namespace without whole-course chunks (e.g. one
+    indexed before they existed) is not listed again on every start.
+    """
+    paths = (lexical_index_path(namespace), source_index_path(namespace))
+    indexes_missing = not all(os.path.exists(path) for path in paths)
+    course_table = get_course_table(namespace)
+    marker = f"{course_table_path(namespace)}.restored"
+    table_missing = not len(course_table) and not os.path.exists(marker)
+    if not indexes_missing and not table_missing:
+        return
+    status.update(label="Rebuilding the search indexes and course table from the stored vectors...")
+    lexical_index = LexicalIndex()
+    source_index = SourceIndex()
+    courses = {}
+    try:
+        with span("ingest.restore_indexes"):
+            for chunk in load_chunks():
+                # Vectors indexed before chunks carried metadata have no
+                # source to attribute, so they would only add empty links
+                if not chunk["source"]:
+                    continue
+                lexical_index.add(chunk)
+                source_index.add_text(chunk["text"], chunk["source"])
+                record = parse_course_block(chunk["text"], chunk["source"]) if chunk["page"] == 0 else None
+                if record:
+                    courses[record["code"]] = record
+    except Exception as e:
+        status.write(f"Could not rebuild the search indexes: {e}")
+        return
+    if indexes_missing:
+        lexical_index.save(lexical_index_path(namespace))
+        source_index.save(source_index_path(namespace))
+    if table_missing:
+        course_table.rebuild(courses.values())
+        with open(marker, "w"):
+            pass
+    reload_indexes()
+
+def load_local_catalog(catalog, embeddings, status):
+    """Load or build one catalog's local vector index (VECTOR_BACKEND)"""
+    namespace = catalog["namespace"]
+    directory = local_index_dir(namespace)
+    path = os.path.join(directory, "manifest.json")
+    store = LocalVectorStore.load(directory, embeddings, VECTOR_BACKEND)
+    if store is None:
+        snapshot = load_latest_snapshot(catalog, status)
+        if snapshot is not None:
+            # Incremental sync continues from the snapshot's manifest
+            store = warm_start_local(snapshot, embeddings, status, VECTOR_BACKEND, path, namespace)
+    if store is not None and len(store) > 0 and INDEX_SYNC_MODE == "load":
+        status.update(label=f"Found {len(store)} existing vectors in the local {catalog['name']} index. Loading...")
+        restore_side_indexes(lambda: store.vectors_for(store.ids)[0], namespace, status)
+        return store
+    
+    if store is None:
+        # The manifest only describes a saved index; without one, sync everything
+        store = LocalVectorStore(embeddings, backend=VECTOR_BACKEND)
+        _remove_file(path)
+    # Local upserts only become durable on save, so there is nothing to resume
+    _remove_file(f"{path}.journal")
+    
+    with span("ingest.total", catalog=catalog["name"]):
+        # Crawl and parse dependencies are only imported when ingest runs
+        from utils.document_processor import process_documents
+
+        chunks, source_index, courses, failed = process_documents(status, catalog)
+        lexical_index = LexicalIndex()
+        result = sync_chunks(lexical_index.indexing(chunks), embeddings, store, path, status, failed)
+        if not any(result.values()):
+            status.update(label="No text was extracted from the provided sources.", state="error")
+            return None
+        store.save(directory)
+        source_index.save(source_index_path(namespace))
+        lexical_index.save(lexical_index_path(namespace))
+        get_course_table(namespace).rebuild(courses.values())
+        reload_indexes()
+        status.update(
+            label=f"Local {catalog['name']} index synced: {result['added']} added, {result['deleted']} deleted, {result['unchanged']} unchanged.",
+            state="complete"
+        )
+    return store
 
 def initialize_pinecone():
     """Initialize Pinecone vector store"""
-    if st.session_state.pinecone_initialized:
-        return True
-        
-    # Initialize Pinecone
-    pinecone_api_key = os.environ.get("PINECONE_API_KEY")
-    pc = Pinecone(api_key=pinecone_api_key)
-    
-    # Check if index exists
-    existing_indexes = [index.name for index in pc.list_indexes()]
+    from pinecone import ServerlessSpec
+
+    # Check if index exists; an unreachable Pinecone leaves the caller to fall back to snapshots
+    try:
+        pc = get_pinecone_client()
+        existing_indexes = [index.name for index in pc.list_indexes()]
+    except Exception as e:
+        st.error(f"Error connecting to Pinecone: {e}")
+        return False
     
     if PINECONE_INDEX_NAME not in existing_indexes:
         try:
@@ -35,56 +356,248 @@ def initialize_pinecone():
             st.error(f"Error creating Pinecone index: {e}")
             return False
     
-    st.session_state.pinecone_initialized = True
     return True
 
-def load_data():
-    """Load and process data with Pinecone integration"""
-    # Initialize Pinecone
+def _create_pinecone_index():
+    """Create the pooled index handle, making sure the index exists first"""
     if not initialize_pinecone():
         return None
-        
-    # Create embeddings instance
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    try:
+        return get_pinecone_client().Index(PINECONE_INDEX_NAME, pool_threads=PINECONE_POOL_THREADS)
+    except Exception as e:
+        st.error(f"Error opening the Pinecone index: {e}")
+        return None
+
+# One pooled index handle per process, reconnected if a health check fails
+_pinecone_index = SharedResource(_create_pinecone_index, health_check=lambda index: index.describe_index_stats())
+
+def get_pinecone_index():
+    """Return the process-wide Pinecone index handle"""
+    return _pinecone_index.get()
+
+@functools.cache
+def _shared_index_store_class():
+    from langchain_pinecone import PineconeVectorStore
+
+    class SharedIndexVectorStore(PineconeVectorStore):
+        """A PineconeVectorStore that queries through the current pooled index handle
+
+        A failed health check replaces the handle (see _pinecone_index); the
+        store picks up the new one on its next call.
+        """
+
+        @property
+        def index(self):
+            return get_pinecone_index() or self._index
+
+    return SharedIndexVectorStore
+
+def pinecone_store(index, embeddings, namespace):
+    """Return a vector store over one namespace of the shared Pinecone index"""
+    return _shared_index_store_class()(index=index, embedding=embeddings, namespace=namespace)
+
+
+def load_pinecone_catalog(catalog, index, embeddings, status):
+    """Load one catalog from its Pinecone namespace, syncing it first if needed"""
+    namespace = catalog["namespace"]
+    path = manifest_path(namespace)
+    # Reading a snapshot means decompressing it; only do so for an empty namespace or as a fallback
+    open_snapshot = functools.cache(lambda: load_latest_snapshot(catalog, status))
+    # Batches journaled by an interrupted sync are already in Pinecone; finish that sync
+    resuming = sync_interrupted(path)
     
-    # Check if vectors already exist in Pinecone
-    pinecone_api_key = os.environ.get("PINECONE_API_KEY")
-    pc = Pinecone(api_key=pinecone_api_key)
-    index = pc.Index(PINECONE_INDEX_NAME)
+    # Check if vectors already exist in the catalog's namespace
     
+    vector_count = 0
     try:
         stats = index.describe_index_stats()
-        vector_count = stats.namespaces.get(PINECONE_NAMESPACE, {}).get("vector_count", 0)
+        vector_count = stats.namespaces.get(namespace, {}).get("vector_count", 0)
+        if vector_count == 0:
+            # Nothing is indexed, whatever a manifest or journal left behind says
+            _remove_file(path)
+            _remove_file(f"{path}.journal")
+            resuming = False
+        
+        snapshot = open_snapshot() if vector_count == 0 else None
+        if snapshot is not None:
+            # Bulk-load the snapshot instead of crawling and embedding everything
+            with span("ingest.warm_start"):
+                status.update(label="Loading vectors from snapshot into Pinecone...")
+                PineconeIndexWriter(index, namespace).bulk_upsert(snapshot["chunks"], snapshot["vectors"])
+                install_snapshot_indexes(snapshot, path, namespace)
+                status.write(f"Loaded {snapshot['manifest']['count']} vectors from snapshot {snapshot['manifest']['version']}.")
+            vector_count = snapshot["manifest"]["count"]
         
-        if vector_count > 0:
+        if vector_count > 0 and INDEX_SYNC_MODE == "load" and not resuming:
             # Vectors already exist in Pinecone - retrieve them
-            st.write(f"Found {vector_count} existing vectors in Pinecone. Loading...")
-            vectorstore = PineconeVectorStore(
-                index_name=PINECONE_INDEX_NAME,
-                embedding=embeddings,
-                namespace=PINECONE_NAMESPACE
-            )
-            return vectorstore
+            status.update(label=f"Found {vector_count} existing vectors for the {catalog['name']} catalog. Loading...")
+            restore_side_indexes(lambda: pinecone_chunks(index, namespace), namespace, status)
+            return pinecone_store(index, embeddings, namespace)
     except Exception as e:
-        st.write(f"Error checking Pinecone stats: {e}")
+        status.write(f"Error checking Pinecone stats: {e}")
+        snapshot = open_snapshot()
+        if snapshot is not None:
+            status.write("Serving the latest snapshot locally instead.")
+            return warm_start_local(snapshot, embeddings, status, namespace=namespace)
         # Continue with data processing if there's an error
     
-    # If we get here, we need to process the data and create embeddings
-    with st.status("Processing documents and creating embeddings...", expanded=True) as status:
-        # Process documents
-        chunks, _ = process_documents(status)
+    # If we get here, we need to process the data and sync embeddings
+    with span("ingest.total", catalog=catalog["name"]):
+        # Crawl and parse dependencies are only imported when ingest runs
+        from utils.document_processor import process_documents
+
+        # Stream documents: chunks are produced lazily as downloads complete
+        chunks, source_index, courses, failed = process_documents(status, catalog)
         
-        if not chunks:
-            return None
+        writer = PineconeIndexWriter(index, namespace)
+        if resuming:
+            status.update(label="Resuming an interrupted index sync...")
+        elif vector_count > 0 and not os.path.exists(path):
+            # Keep serving the namespace while the manifest is rebuilt from it
+            status.update(label="No index manifest found; rebuilding it from the namespace...")
+            _remove_file(f"{path}.journal")
+            unusable = rebuild_sync_manifest(index, namespace, path)
+            if unusable:
+                status.write(f"{unusable} vectors without source metadata will be replaced.")
         
-        # Create embeddings and build a vector store using Pinecone
-        status.update(label="Creating embeddings and upserting to Pinecone...")
-        vectorstore = PineconeVectorStore.from_texts(
-            chunks,
-            embeddings,
-            index_name=PINECONE_INDEX_NAME,
-            namespace=PINECONE_NAMESPACE
+        # Embed and upsert only new or changed chunks, and delete stale ones
+        status.update(label="Creating embeddings and syncing with Pinecone...")
+        lexical_index = LexicalIndex()
+        result = sync_chunks(lexical_index.indexing(chunks), embeddings, writer, path, status, failed)
+        if not any(result.values()):
+            status.update(label="No text was extracted from the provided sources.", state="error")
+            return None
+        # Persist the source attribution and lexical indexes next to the manifest
+        source_index.save(source_index_path(namespace))
+        lexical_index.save(lexical_index_path(namespace))
+        get_course_table(namespace).rebuild(courses.values())
+        reload_indexes()
+        status.update(
+            label=f"Pinecone {catalog['name']} synced: {result['added']} added, {result['deleted']} deleted, {result['unchanged']} unchanged.",
+            state="complete"
         )
-        status.update(label="Embeddings successfully created and stored in Pinecone!", state="complete")
-        
-        return vectorstore
\ No newline at end of file
+        return pinecone_store(index, embeddings, namespace)
+
+def warm_start_catalog(catalog, embeddings, status):
+    """Serve a catalog from its latest snapshot while Pinecone is unavailable, or return None"""
+    status.update(label=f"Pinecone is unavailable; serving the latest {catalog['name']} snapshot locally...")
+    snapshot = load_latest_snapshot(catalog, status)
+    if snapshot is None:
+        status.update(label=f"Pinecone is unavailable and the {catalog['name']} catalog has no snapshot.")
+        return None
+    return warm_start_local(snapshot, embeddings, status, namespace=catalog["namespace"])
+
+def _load_catalog(load, catalog, status):
+    """Run a catalog loader, reporting the outcome on its status container"""
+    try:
+        store = load(catalog, status)
+    except Exception as e:
+        status.update(label=f"Error loading the {catalog['name']} catalog: {e}", state="error")
+        return None
+    status.update(state="complete" if store is not None else "error", expanded=False)
+    return store
+
+def load_data():
+    """Load every catalog in the catalog manifest, each from its own namespace
+
+    Catalogs that need crawling and embedding are ingested in parallel
+    (CATALOG_INGEST_WORKERS at a time). Returns CatalogStores over the
+    catalogs that loaded, or None if none did.
+    """
+    catalogs = get_catalogs()
+    embeddings = get_embeddings()
+    if VECTOR_BACKEND == "pinecone":
+        index = get_pinecone_index()
+        if index is None:
+            # Without Pinecone, every catalog with a snapshot is served from it locally
+            load = lambda catalog, status: warm_start_catalog(catalog, embeddings, status)
+        else:
+            load = lambda catalog, status: load_pinecone_catalog(catalog, index, embeddings, status)
+    else:
+        load = lambda catalog, status: load_local_catalog(catalog, embeddings, status)
+    
+    statuses = [_status_container(f"Loading the {catalog['name']} catalog...") for catalog in catalogs]
+    with profiled(INGEST_PROFILE_PATH):
+        if len(catalogs) == 1:
+            stores = [_load_catalog(load, catalogs[0], statuses[0])]
+        else:
+            jobs = [(functools.partial(_load_catalog, load, catalog), status) for catalog, status in zip(catalogs, statuses)]
+            stores = _run_relayed(jobs, CATALOG_INGEST_WORKERS)
+    
+    loaded = [(catalog, store) for catalog, store in zip(catalogs, stores) if store is not None]
+    if not loaded:
+        return None
+    served = [catalog for catalog, _ in loaded]
+    if not any(catalog["default"] for catalog in served):
+        served[0] = {**served[0], "default": True}
+    return CatalogStores(served, {catalog["name"]: store for catalog, store in loaded})
+
+# The vector store is loaded once per process and shared by every session
+_vectorstore = SharedResource(load_data)
+
+def get_vectorstore():
+    """Return the process-wide catalog stores, loading them on first use"""
+    return _vectorstore.get()
+
+def _catalog_named(name=None):
+    catalogs = get_catalogs()
+    if name is None:
+        return default_catalog(catalogs)
+    catalog = next((catalog for catalog in catalogs if catalog["name"] == name), None)
+    if catalog is None:
+        raise RuntimeError(f"No enabled catalog is named {name}.")
+    return catalog
+
+def _sync_manifest_of(chunks):
+    return {chunk["id"]: {"source": chunk["source"], "hash": content_hash(chunk["text"])} for chunk in chunks}
+
+def export_catalog(catalog_name=None):
+    """Copy a catalog's Pinecone namespace into its local index directory, returning the vector count
+
+    The local index's sync manifest is written too, so a later local sync
+    only embeds what changed.
+    """
+    index = get_pinecone_index()
+    if index is None:
+        raise RuntimeError("Pinecone is unavailable.")
+    namespace = _catalog_named(catalog_name)["namespace"]
+    directory = local_index_dir(namespace)
+    store = LocalVectorStore(get_embeddings())
+    count = export_pinecone_namespace(index, namespace, store)
+    store.save(directory)
+    save_manifest(_sync_manifest_of(store.vectors_for(store.ids)[0]), os.path.join(directory, "manifest.json"))
+    return count
+
+def import_catalog(catalog_name=None):
+    """Upsert a catalog's local index into its Pinecone namespace, returning the vector count"""
+    index = get_pinecone_index()
+    if index is None:
+        raise RuntimeError("Pinecone is unavailable.")
+    namespace = _catalog_named(catalog_name)["namespace"]
+    directory = local_index_dir(namespace)
+    store = LocalVectorStore.load(directory, get_embeddings())
+    if store is None:
+        raise RuntimeError(f"No local index in {directory}.")
+    count = import_into_pinecone(store, index, namespace)
+    save_manifest(_sync_manifest_of(store.vectors_for(store.ids)[0]), manifest_path(namespace))
+    return count
+
+def build_snapshot(directory=SNAPSHOT_DIR, catalog_name=None):
+    """Snapshot a catalog's index (default: the default catalog), loading or
+    building it first, and return the snapshot path"""
+    catalog_stores = get_vectorstore()
+    if catalog_stores is None:
+        raise RuntimeError("The vector store could not be loaded.")
+    catalog = default_catalog(catalog_stores.catalogs)
+    if catalog_name is not None:
+        catalog = next((c for c in catalog_stores.catalogs if c["name"] == catalog_name), None)
+        if catalog is None:
+            raise RuntimeError(f"The {catalog_name} catalog is not loaded.")
+    namespace = catalog["namespace"]
+    store = catalog_stores.stores[catalog["name"]]
+    if not isinstance(store, LocalVectorStore):
+        store = LocalVectorStore(get_embeddings())
+        export_pinecone_namespace(get_pinecone_index(), namespace, store)
+    with span("ingest.snapshot"):
+        return write_snapshot(store, SourceIndex.load(source_index_path(namespace)),
+                              get_course_table(namespace).records(), catalog, directory)